@@ -23,6 +23,8 @@ parser.add_argument('--mat', nargs='+',
                     help='labels for materialpoint',dest='mat')
 parser.add_argument('--con', nargs='+',
                     help='labels for constituent',dest='con')
+parser.add_argument('-f','--format', dest='format',default='txt',choices=['txt','npz','parquet','feather'],
+                    help='output format, binary formats can be read with damask.Table.load_<format>')
 
 options = parser.parse_args()
 
@@ -41,23 +43,31 @@ for filename in options.filenames:
         table = damask.Table(np.ones(np.product(results.grid),dtype=int)*int(inc[3:]),{'inc':(1,)})\
                       .add('pos',coords.reshape(-1,3))
 
+        columns = {}
         results.pick('materialpoints',False)
         results.pick('constituents',  True)
         for label in options.con:
             x = results.get_dataset_location(label)
             if len(x) != 0:
-                table = table.add(label,results.read_dataset(x,0,plain=True).reshape(results.grid.prod(),-1))
+                columns[label] = results.read_dataset(x,0,plain=True).reshape(results.grid.prod(),-1)
 
         results.pick('constituents',  False)
         results.pick('materialpoints',True)
         for label in options.mat:
             x = results.get_dataset_location(label)
             if len(x) != 0:
-                table = table.add(label,results.read_dataset(x,0,plain=True).reshape(results.grid.prod(),-1))
+                columns[label] = results.read_dataset(x,0,plain=True).reshape(results.grid.prod(),-1)
+
+        if columns:                                                                                 # join once, Table.add copies
+            table = table.join(damask.Table(np.hstack(list(columns.values())),
+                                            {label:data.shape[1:] for label,data in columns.items()}))
 
         dirname  = os.path.abspath(os.path.join(os.path.dirname(filename),options.dir))
         if not os.path.isdir(dirname):
             os.mkdir(dirname,0o755)
-        file_out = '{}_inc{}.txt'.format(os.path.splitext(os.path.split(filename)[-1])[0],
-                                         inc[3:].zfill(N_digits))
-        table.save(os.path.join(dirname,file_out),legacy=True)
+        file_out = '{}_inc{}.{}'.format(os.path.splitext(os.path.split(filename)[-1])[0],
+                                        inc[3:].zfill(N_digits),options.format)
+        if options.format == 'txt':
+            table.save(os.path.join(dirname,file_out),legacy=True)
+        else:
+            getattr(table,f'save_{options.format}')(os.path.join(dirname,file_out))
@@ -25,6 +25,7 @@ from ._config          import Config           # noqa
 from ._configmaterial  import ConfigMaterial   # noqa
 from ._geom            import Geom             # noqa
 from ._result          import Result           # noqa
+from ._resultset       import ResultSet        # noqa
 
 
 
@@ -1,5 +1,4 @@
 import copy
-import multiprocessing as mp
 from functools import partial
 from os import path
 
@@ -8,7 +7,6 @@ import pandas as pd
 import h5py
 from scipy import ndimage,spatial
 
-from . import environment
 from . import VTK
 from . import util
 from . import grid_filters
@@ -274,11 +272,11 @@ class Geom:
 
 
     @staticmethod
-    def _find_closest_seed(seeds, weights, point):
-        return np.argmin(np.sum((np.broadcast_to(point,(len(seeds),3))-seeds)**2,axis=1) - weights)
+    def _find_closest_seed(seeds, weights, points):
+        return np.argmin(np.sum((points[:,np.newaxis]-seeds)**2,axis=2) - weights,axis=1)
 
     @staticmethod
-    def from_Laguerre_tessellation(grid,size,seeds,weights,material=None,periodic=True):
+    def from_Laguerre_tessellation(grid,size,seeds,weights,material=None,periodic=True,executor='process'):
         """
         Generate geometry from Laguerre tessellation.
 
@@ -297,6 +295,8 @@ class Geom:
             consecutively numbered.
         periodic : Boolean, optional
             Perform a periodic tessellation. Defaults to True.
+        executor : {'process', 'thread', 'serial'}, optional
+            Parallelization of the search for the closest seed. Defaults to 'process'.
 
         """
         if periodic:
@@ -310,11 +310,9 @@ class Geom:
             seeds_p   = seeds
             coords    = grid_filters.cell_coord0(grid,size).reshape(-1,3)
 
-        pool = mp.Pool(processes = int(environment.options['DAMASK_NUM_THREADS']))
-        result = pool.map_async(partial(Geom._find_closest_seed,seeds_p,weights_p), [coord for coord in coords])
-        pool.close()
-        pool.join()
-        material_ = np.array(result.get())
+        chunks = np.array_split(coords,max(1,len(coords)*len(seeds_p)//2**20))                      # limit memory per task
+        with util._executor(executor) as pool:
+            material_ = np.concatenate(list(pool.map(partial(Geom._find_closest_seed,seeds_p,weights_p),chunks)))
 
         if periodic:
             material_ = material_.reshape(grid*3)
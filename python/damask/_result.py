@@ -1,15 +1,27 @@
 import multiprocessing as mp
+import threading
+import ast
+import builtins
+import pickle
+import queue
+import time
 import re
 import glob
+import itertools
+import weakref
 import os
 import datetime
 import xml.etree.ElementTree as ET
 import xml.dom.minidom
 from pathlib import Path
-from functools import partial
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+
+from scipy import spatial
 
 import h5py
 import numpy as np
+import pandas as pd
 from numpy.lib import recfunctions as rfn
 
 import damask
@@ -23,6 +35,664 @@ from . import util
 
 h5py3 = h5py.__version__[0] == '3'
 
+
+class _Overlay:
+    """
+    Combined view of a DADF5 file and a sidecar file with derived datasets.
+
+    Datasets of the sidecar file take precedence, all other objects and
+    attributes are taken from the DADF5 file, which is opened read-only.
+    New datasets are written to the sidecar file.
+    """
+
+    def __init__(self,master,sidecar):
+        self.master  = master
+        self.sidecar = sidecar
+
+    @property
+    def mode(self):
+        return self.sidecar.mode
+
+    @property
+    def attrs(self):
+        return self.master.attrs
+
+    def keys(self):
+        return self.master.keys()
+
+    def __contains__(self,name):
+        return name in self.sidecar or name in self.master
+
+    def __getitem__(self,name):
+        if name in self.sidecar and isinstance(self.sidecar[name],h5py.Dataset):
+            return self.sidecar[name]
+        return self.master[name]
+
+    def __setitem__(self,name,obj):
+        self.sidecar[name] = obj
+
+    def __delitem__(self,name):
+        del self.sidecar[name]
+
+    def create_dataset(self,name,**kwargs):
+        return self.sidecar.create_dataset(name,**kwargs)
+
+    def close(self):
+        self.sidecar.close()
+        self.master.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+
+class _LRUCache:
+    """
+    Least recently used (LRU) cache for decoded datasets with a size limit in bytes.
+
+    Each entry records the paths of the datasets it was read from
+    to allow for invalidation when one of them is modified.
+    """
+
+    def __init__(self,N_bytes=0):
+        self.N_bytes = N_bytes
+        self.entries = OrderedDict()
+        self.size    = 0
+        self.hits    = 0
+        self.misses  = 0
+        self._lock   = threading.Lock()
+
+    def __getstate__(self):
+        """Exclude lock and entries from pickling."""
+        state = self.__dict__.copy()
+        state['entries'] = OrderedDict()
+        state['size'] = 0
+        del state['_lock']
+        return state
+
+    def __setstate__(self,state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self,key):
+        """Return a copy of the cached data or None."""
+        if self.N_bytes == 0: return None                                                           # disabled, no statistics
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0].copy()
+            self.misses += 1
+            return None
+
+    def put(self,key,data,paths):
+        """Store a copy of the data, evicting least recently used entries if needed."""
+        if data.nbytes > self.N_bytes: return
+        with self._lock:
+            self._remove(key)
+            while self.size + data.nbytes > self.N_bytes:
+                self._remove(next(iter(self.entries)))
+            self.entries[key] = (data.copy(),set(paths))
+            self.size += data.nbytes
+
+    def resize(self,N_bytes):
+        """Set the size limit, evicting least recently used entries if needed."""
+        with self._lock:
+            self.N_bytes = N_bytes
+            while self.size > self.N_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def invalidate(self,path):
+        """Remove all entries that depend on the given dataset."""
+        with self._lock:
+            for key in [k for k,(_,paths) in self.entries.items() if path in paths]:
+                self._remove(key)
+
+    def _remove(self,key):
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[0].nbytes
+
+
+class _SharedLock:
+    """
+    Reentrant lock with shared (read) and exclusive (write) access.
+
+    Exclusive access waits until no other thread holds shared access,
+    waiting writers take precedence over new readers.
+    """
+
+    def __init__(self):
+        self._cond    = threading.Condition(threading.Lock())
+        self._owner   = None
+        self._depth   = 0
+        self._readers = {}
+        self._waiting = 0
+
+    def _free(self,me):
+        return self._owner is None and not any(n for t,n in self._readers.items() if t != me)
+
+    def acquire(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner == me:
+                self._depth += 1
+                return
+            self._waiting += 1
+            self._cond.wait_for(lambda: self._free(me))
+            self._waiting -= 1
+            self._owner,self._depth = me,1
+
+    def release(self):
+        with self._cond:
+            self._depth -= 1
+            if self._depth == 0:
+                self._owner = None
+                self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self,*args):
+        self.release()
+
+    def wait_for(self,predicate):
+        """Release exclusive access until predicate is fulfilled."""
+        me = threading.get_ident()
+        with self._cond:
+            depth,self._owner,self._depth = self._depth,None,0
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: predicate() and self._free(me))
+            self._owner,self._depth = me,depth
+
+    @contextmanager
+    def shared(self):
+        """Shared access."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner != me and not self._readers.get(me):
+                self._cond.wait_for(lambda: self._owner is None and self._waiting == 0)
+            self._readers[me] = self._readers.get(me,0) + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers[me] -= 1
+                if self._readers[me] == 0: del self._readers[me]
+                self._cond.notify_all()
+
+
+class _Formula:
+    """
+    Formula with datasets referenced by '#label#', parsed once and evaluated blockwise.
+
+    The expression is parsed into an abstract syntax tree, constant subexpressions
+    are folded, and all names are resolved up front. Formulas composed of
+    arithmetic, comparisons, NumPy ufuncs, and row-preserving indexing are
+    evaluated in blocks of rows that fit into the CPU cache, i.e. without
+    full-size temporaries for intermediate results. Other expressions, e.g.
+    conditional expressions or comprehensions, are evaluated as a whole.
+    """
+
+    block_bytes = 2**18
+    _tokens = itertools.count()                                                                     # never reused, unlike id
+    _alive = weakref.WeakValueDictionary()                                                          # inherited by forked workers
+
+    class Unsupported(Exception):
+        """Expression that cannot be analyzed, i.e. not evaluated blockwise."""
+
+    def __init__(self,formula,functions={}):
+        """
+        Parse formula.
+
+        Parameters
+        ----------
+        formula : str
+            Formula, datasets are referenced by '#label#'.
+        functions : dict, optional
+            Additional functions that can be called by name.
+
+        """
+        self.formula = formula
+        self.labels = list(dict.fromkeys(re.findall(r'#(.*?)#',formula)))
+        self.functions = dict(functions)
+        self.token = next(_Formula._tokens)
+        _Formula._alive[self.token] = self
+        expression = formula
+        for i,label in enumerate(self.labels):
+            expression = expression.replace(f'#{label}#',f'_{i}_')
+        try:
+            tree = ast.parse(expression.strip(),mode='eval')
+        except SyntaxError as err:
+            raise ValueError(f'invalid formula "{formula}": {err.msg}')
+        self.tree = ast.fix_missing_locations(self._fold(tree))
+        try:
+            self.blockwise = self._check(self.tree.body)
+        except self.Unsupported:
+            self.blockwise = False
+        self._code = compile(self.tree,'<formula>','eval')
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_code']
+        state['functions'] = {}
+        for name,func in self.functions.items():
+            try:
+                pickle.dumps(func)
+                state['functions'][name] = func
+            except Exception:                                                                       # e.g. local function
+                state['functions'][name] = None                                                     # taken from forked copy
+        return state
+
+    def __setstate__(self,state):
+        for name,func in state['functions'].items():
+            if func is not None: continue
+            original = _Formula._alive.get(state['token'])
+            if original is None:
+                raise pickle.UnpicklingError(f'function "{name}" is not available in worker process, '
+                                             'define it at the top level of a module')
+            state['functions'][name] = original.functions[name]
+        self.__dict__.update(state)
+        self._code = compile(self.tree,'<formula>','eval')
+
+    @property
+    def namespace(self):
+        return {**globals(),'numpy':np,**self.functions}
+
+    @staticmethod
+    def _fold(tree):
+        """Evaluate subexpressions without datasets, e.g. '2.0*np.pi'."""
+        class Folder(ast.NodeTransformer):
+            def visit_BinOp(self,node):
+                self.generic_visit(node)
+                if isinstance(node.left,ast.Constant) and isinstance(node.right,ast.Constant):
+                    try:
+                        return ast.copy_location(ast.Constant(eval(compile(ast.Expression(node),'','eval'),
+                                                                   {'__builtins__':{}})),node)
+                    except Exception:
+                        pass
+                return node
+            def visit_UnaryOp(self,node):
+                self.generic_visit(node)
+                if isinstance(node.operand,ast.Constant):
+                    try:
+                        return ast.copy_location(ast.Constant(eval(compile(ast.Expression(node),'','eval'),
+                                                                   {'__builtins__':{}})),node)
+                    except Exception:
+                        pass
+                return node
+        return Folder().visit(tree)
+
+    def _resolve(self,node):
+        """Object referenced by a name or attribute, e.g. 'np.linalg.det'."""
+        if isinstance(node,ast.Name):
+            namespace = {**vars(builtins),**self.namespace}
+            if node.id not in namespace:
+                raise ValueError(f'unknown name "{node.id}" in formula "{self.formula}"')
+            return namespace[node.id]
+        try:
+            return getattr(self._resolve(node.value),node.attr)
+        except AttributeError:
+            raise ValueError(f'unknown attribute "{node.attr}" in formula "{self.formula}"')
+
+    def _check(self,node):
+        """Validate names and determine whether the expression can be evaluated block by block."""
+        if isinstance(node,ast.Constant):
+            return True
+        if isinstance(node,ast.Name) and re.fullmatch(r'_[0-9]+_',node.id):
+            return True
+        if isinstance(node,(ast.Name,ast.Attribute)):
+            if isinstance(node,ast.Attribute) and not self._is_module_attribute(node):
+                self._check(node.value)
+                return False                                                                        # e.g. '#F#.T'
+            self._resolve(node)
+            return True
+        if isinstance(node,ast.BinOp):
+            return all([self._check(node.left),self._check(node.right)])
+        if isinstance(node,ast.UnaryOp):
+            return self._check(node.operand)
+        if isinstance(node,ast.Compare):
+            return all([self._check(n) for n in [node.left,*node.comparators]])
+        if isinstance(node,ast.Call):
+            arguments = all([self._check(n) for n in [*node.args,*[k.value for k in node.keywords]]])
+            if isinstance(node.func,ast.Attribute) and not self._is_module_attribute(node.func):
+                self._check(node.func.value)
+                return False                                                                        # e.g. '#F#.sum()'
+            if not isinstance(node.func,(ast.Name,ast.Attribute)):
+                raise self.Unsupported
+            func = self._resolve(node.func)
+            return arguments and (isinstance(func,np.ufunc) or func is abs)
+        if isinstance(node,ast.Subscript):
+            value = self._check(node.value)
+            index = node.slice.elts if isinstance(node.slice,ast.Tuple) else [node.slice]
+            for i in index: self._check_index(i)
+            first = index[0]
+            return value and ((isinstance(first,ast.Slice) and first.lower is None and first.upper is None
+                               and first.step is None)
+                              or (isinstance(first,ast.Constant) and first.value is Ellipsis))
+        if isinstance(node,(ast.Tuple,ast.List)):
+            for n in node.elts: self._check(n)
+            return False
+        raise self.Unsupported
+
+    def _check_index(self,node):
+        if isinstance(node,ast.Slice):
+            for n in [node.lower,node.upper,node.step]:
+                if n is not None: self._check(n)
+        else:
+            self._check(node)
+
+    def _is_module_attribute(self,node):
+        while isinstance(node,ast.Attribute):
+            node = node.value
+        return isinstance(node,ast.Name) and not re.fullmatch(r'_[0-9]+_',node.id)
+
+    def __call__(self,data):
+        """
+        Evaluate formula.
+
+        Parameters
+        ----------
+        data : dict
+            Data of the datasets referenced in the formula.
+
+        """
+        namespace = {**self.namespace,'__builtins__':builtins}
+        arrays = {f'_{i}_':np.asarray(data[label]) for i,label in enumerate(self.labels)}
+        N_rows = {len(a) for a in arrays.values() if a.ndim > 0}
+        bytes_per_row = sum(a[0].nbytes for a in arrays.values() if a.ndim > 0)
+        if not self.blockwise or len(N_rows) != 1 or bytes_per_row == 0 \
+           or next(iter(N_rows))*bytes_per_row <= self.block_bytes:
+            return eval(self._code,{**namespace,**arrays})                                          # globals, visible in comprehensions
+
+        N = N_rows.pop()
+        block = max(1,self.block_bytes//bytes_per_row)
+        def rows(s):
+            return {k:v[s:s+block] if v.ndim > 0 else v for k,v in arrays.items()}
+
+        first = np.asarray(eval(self._code,{**namespace,**rows(0)}))
+        if first.ndim == 0 or len(first) != min(block,N):                                           # not row-preserving
+            return eval(self._code,{**namespace,**arrays})
+        out = np.empty((N,)+first.shape[1:],first.dtype)
+        out[:block] = first
+        for s in range(block,N,block):
+            out[s:s+block] = eval(self._code,{**namespace,**rows(s)})
+        return out
+
+
+class _GroupBy:
+    """
+    Grouped reductions of datasets (see Result.groupby).
+
+    The rows of the data of each constituent/materialpoint are sorted by group
+    only once. Reductions are then segmented (numpy.ufunc.reduceat) over
+    contiguous rows and the increments are processed concurrently.
+    """
+
+    def __init__(self,result,by,c=0):
+        self.result = result
+        self.c = c
+        if isinstance(by,str):
+            what = {'phase':'constituent','constituent':'constituent',
+                    'homogenization':'materialpoint','materialpoint':'materialpoint'}.get(by)
+            if what is None:
+                raise ValueError(f'invalid grouping "{by}", material IDs are not stored in DADF5 files '
+                                  'and need to be given per cell (e.g. Geom.material.flatten(order="F"))')
+            keys = np.empty(result.Nmaterialpoints,dtype=object)
+            for name,(cells,_) in result._mapping(what,c).items():
+                keys[cells] = name
+            keys = keys.astype(str)
+        else:
+            keys = np.asarray(by).reshape(-1)
+            if len(keys) != result.Nmaterialpoints:
+                raise ValueError(f'{len(keys)} group keys given for {result.Nmaterialpoints} cells')
+        self.keys,self._codes = np.unique(keys,return_inverse=True)
+        self._segments = {}
+
+    def _segment(self,path):
+        """Cells and rows of a dataset sorted by group, start of each segment, and the groups."""
+        what,name = path.split('/')[1:3]
+        key = (what,'' if what == 'geometry' else name)
+        if key not in self._segments:
+            if what == 'geometry':
+                cells = rows = np.arange(self.result.Nmaterialpoints)
+            else:
+                cells,rows = self.result._mapping(what,self.c)[name]
+            order = np.argsort(self._codes[cells],kind='stable')
+            codes = self._codes[cells][order]
+            starts = np.flatnonzero(np.r_[True,codes[1:] != codes[:-1]]) if len(codes) > 0 else \
+                     np.empty(0,dtype=int)
+            self._segments[key] = (cells[order],rows[order],starts,codes[starts])
+        return self._segments[key]
+
+    def _reduce(self,label,op,weights=None):
+        """
+        Reduce a dataset per group and increment.
+
+        Parameters
+        ----------
+        label : str
+            Label of the dataset.
+        op : {'count', 'sum', 'mean', 'std', 'min', 'max'}
+            Reduction.
+        weights : numpy.ndarray or str, optional
+            Weights per cell or label of a scalar dataset.
+
+        """
+        r = self.result
+        paths = {}
+        for path in r.get_dataset_location(label):
+            if path.split('/')[1] == 'geometry' and r._index_lookup(path)['shape'][0] != r.Nmaterialpoints:
+                raise ValueError(f'dataset "{label}" is not defined per cell')
+            paths.setdefault(path.split('/')[0],[]).append(path)
+            self._segment(path)
+        weights_cells = None if weights is None or isinstance(weights,str) else np.asarray(weights,float).reshape(-1)
+        N_groups = len(self.keys)
+
+        def reduce_increment(paths):
+            n = np.zeros(N_groups)
+            acc = {}
+            for path in paths:
+                cells,rows,starts,groups = self._segment(path)
+                if len(rows) == 0: continue
+                x = f[path][()][rows]
+                if isinstance(weights,str):
+                    w = f[path.rsplit('/',1)[0]+'/'+weights][()].reshape(-1)[rows].astype(float)
+                else:
+                    w = np.ones(len(rows)) if weights_cells is None else weights_cells[cells]
+                counts = np.diff(np.r_[starts,len(rows)])
+                if x.dtype.names is not None:
+                    if op == 'mean' and set(x.dtype.names) == {'w','x','y','z'}:
+                        self._accumulate_orientations(acc,rfn.structured_to_unstructured(x[['w','x','y','z']]),w,
+                                                      r._index_lookup(path)['attrs']['Lattice'],
+                                                      starts,groups,counts,N_groups)
+                        n[groups] += np.add.reduceat(w,starts)
+                        continue
+                    x = rfn.structured_to_unstructured(x)
+                x = x.astype(float,copy=False)
+                w_ = 1.0 if weights is None else w.reshape((-1,)+(1,)*(x.ndim-1))
+                n_seg = counts.astype(float) if weights is None else np.add.reduceat(w,starts)
+                if op in ['sum','mean','std']:
+                    s_seg = np.add.reduceat(x if weights is None else x*w_,starts,axis=0)
+                    if 'sum' not in acc: acc['sum'] = np.zeros((N_groups,)+x.shape[1:])
+                if op == 'std':
+                    mean_seg = s_seg/n_seg.reshape((-1,)+(1,)*(x.ndim-1))
+                    M2_seg = np.add.reduceat(w_*(x-np.repeat(mean_seg,counts,axis=0))**2,starts,axis=0)
+                    if 'M2' not in acc: acc['M2'] = np.zeros((N_groups,)+x.shape[1:])
+                    n_old = n[groups].reshape(mean_seg.shape[:1]+(1,)*(x.ndim-1))
+                    n_new = n_old+n_seg.reshape(n_old.shape)
+                    delta = mean_seg - acc['sum'][groups]/np.where(n_old>0,n_old,1)
+                    acc['M2'][groups] += M2_seg + delta**2*n_old*n_seg.reshape(n_old.shape)/n_new
+                if op in ['sum','mean','std']:
+                    acc['sum'][groups] += s_seg
+                elif op in ['min','max']:
+                    ufunc = np.minimum if op == 'min' else np.maximum
+                    if op not in acc: acc[op] = np.full((N_groups,)+x.shape[1:],np.inf if op == 'min' else -np.inf)
+                    acc[op][groups] = ufunc(acc[op][groups],ufunc.reduceat(x,starts,axis=0))
+                n[groups] += n_seg
+
+            if op == 'count': return n
+            if not acc: return np.full(N_groups,np.nan)
+            if 'quaternion' in acc: return self._average_orientations(acc['quaternion'],n)
+            empty = (n == 0).reshape((-1,)+(1,)*(next(iter(acc.values())).ndim-1))
+            if op == 'sum':
+                return acc['sum']
+            elif op == 'mean':
+                return np.where(empty,np.nan,acc['sum']/np.where(empty,1,n.reshape(empty.shape)))
+            elif op == 'std':
+                return np.where(empty,np.nan,np.sqrt(acc['M2']/np.where(empty,1,n.reshape(empty.shape))))
+            else:
+                return np.where(empty,np.nan,acc[op])
+
+        with r._file() as f, util._executor('thread') as executor:
+            return dict(zip(paths,executor.map(reduce_increment,paths.values())))
+
+    @staticmethod
+    def _accumulate_orientations(acc,q,w,lattice,starts,groups,counts,N_groups):
+        """Add outer products of the symmetrically equivalent quaternions closest to the group reference."""
+        if 'quaternion' not in acc:
+            acc['reference']  = np.full((N_groups,4),np.nan)
+            acc['quaternion'] = np.zeros((N_groups,4,4))
+        new = np.isnan(acc['reference'][groups,0])
+        acc['reference'][groups[new]] = q[starts[new]]
+        equivalent = Orientation(Rotation(q),lattice).equivalent.rotation.quaternion
+        reference = np.repeat(acc['reference'][groups],counts,axis=0)
+        q = equivalent[np.argmax(np.abs(np.sum(equivalent*reference,axis=-1)),axis=0),np.arange(len(q))]
+        acc['quaternion'][groups] += np.add.reduceat(w[:,None,None]*q[:,:,None]*q[:,None,:],starts,axis=0)
+
+    @staticmethod
+    def _average_orientations(M,n):
+        """
+        Average quaternions from the sum of their (weighted) outer products.
+
+        References
+        ----------
+        F. Landis Markley et al., Journal of Guidance, Control, and Dynamics 30(4):1193-1197, 2007
+        https://doi.org/10.2514/1.28949
+
+        """
+        q = np.linalg.eigh(M)[1][...,-1]
+        q *= np.where(q[:,0:1] < 0,-1,1)
+        q[n == 0] = np.nan
+        return q
+
+    def count(self,label,weights=None):
+        """
+        Number of points (or sum of weights) per group and increment.
+
+        Parameters
+        ----------
+        label : str
+            Label of the dataset.
+        weights : numpy.ndarray or str, optional
+            Weights per cell or label of a scalar dataset.
+
+        Returns
+        -------
+        count : dict
+            Counts (ordered as keys) for each increment.
+
+        """
+        return self._reduce(label,'count',weights)
+
+    def sum(self,label,weights=None):
+        """
+        (Weighted) sum per group and increment.
+
+        Parameters
+        ----------
+        label : str
+            Label of the dataset.
+        weights : numpy.ndarray or str, optional
+            Weights per cell or label of a scalar dataset.
+
+        Returns
+        -------
+        sum : dict
+            Sums (ordered as keys) for each increment.
+
+        """
+        return self._reduce(label,'sum',weights)
+
+    def mean(self,label,weights=None):
+        """
+        (Weighted) mean per group and increment.
+
+        Orientations (quaternions with crystal lattice, e.g. 'O') are averaged
+        after selecting for each point the symmetrically equivalent orientation
+        closest to the first one of the group.
+
+        Parameters
+        ----------
+        label : str
+            Label of the dataset.
+        weights : numpy.ndarray or str, optional
+            Weights per cell (e.g. volume) or label of a scalar dataset.
+
+        Returns
+        -------
+        mean : dict
+            Means (ordered as keys) for each increment, NaN for empty groups.
+
+        """
+        return self._reduce(label,'mean',weights)
+
+    def std(self,label,weights=None):
+        """
+        (Weighted) population standard deviation per group and increment.
+
+        Parameters
+        ----------
+        label : str
+            Label of the dataset.
+        weights : numpy.ndarray or str, optional
+            Weights per cell or label of a scalar dataset.
+
+        Returns
+        -------
+        std : dict
+            Standard deviations (ordered as keys) for each increment, NaN for empty groups.
+
+        """
+        return self._reduce(label,'std',weights)
+
+    def min(self,label):
+        """
+        Minimum per group and increment.
+
+        Parameters
+        ----------
+        label : str
+            Label of the dataset.
+
+        Returns
+        -------
+        min : dict
+            Minima (ordered as keys) for each increment, NaN for empty groups.
+
+        """
+        return self._reduce(label,'min')
+
+    def max(self,label):
+        """
+        Maximum per group and increment.
+
+        Parameters
+        ----------
+        label : str
+            Label of the dataset.
+
+        Returns
+        -------
+        max : dict
+            Maxima (ordered as keys) for each increment, NaN for empty groups.
+
+        """
+        return self._reduce(label,'max')
+
+
 class Result:
     """
     Read and write to DADF5 files.
@@ -30,7 +700,7 @@ class Result:
     DADF5 (DAMASK HDF5) files contain DAMASK results.
     """
 
-    def __init__(self,fname):
+    def __init__(self,fname,sidecar=None):
         """
         Open an existing DADF5 file.
 
@@ -38,9 +708,28 @@ class Result:
         ----------
         fname : str
             name of the DADF5 file to be opened.
+        sidecar : str or pathlib.Path, optional
+            name of a separate HDF5 file to store derived datasets.
+            The DADF5 file is then only opened read-only and the datasets
+            of the sidecar file are transparently combined with it.
+            The sidecar file is created if it does not exist, an existing one
+            needs to be created for the same DADF5 file.
+            Defaults to None, i.e. derived datasets are added to the DADF5 file.
 
         """
-        with h5py.File(fname,'r') as f:
+        self.fname   = Path(fname).absolute()
+        self.sidecar = None if sidecar is None else Path(sidecar).absolute()
+        self._comm   = None
+        if self.sidecar is not None and not self.sidecar.exists():
+            with h5py.File(self.sidecar,'w') as f:
+                f.attrs['DADF5 file'] = str(self.fname) if h5py3 else str(self.fname).encode()
+        elif self.sidecar is not None:
+            with h5py.File(self.sidecar,'r') as f:
+                master = f.attrs.get('DADF5 file')
+            if (master.decode() if isinstance(master,bytes) else master) != str(self.fname):
+                raise ValueError(f'sidecar file "{self.sidecar}" belongs to "{master}", not to "{self.fname}"')
+
+        with self._open() as f:
 
             try:
                 self.version_major = f.attrs['DADF5_version_major']
@@ -60,9 +749,7 @@ class Result:
                 self.origin = f['geometry'].attrs['origin'] if self.version_major == 0 and self.version_minor >= 5 else \
                               np.zeros(3)
 
-            r=re.compile('inc[0-9]+')
-            increments_unsorted = {int(i[3:]):i for i in f.keys() if r.match(i)}
-            self.increments     = [increments_unsorted[i] for i in sorted(increments_unsorted)]
+            self.increments     = self._completed_increments(f)
             self.times          = [round(f[i].attrs['time/s'],12) for i in self.increments]
 
             self.Nmaterialpoints, self.Nconstituents =   np.shape(f['mapping/cellResults/constituent'])
@@ -83,27 +770,69 @@ class Result:
                 self.mat_physics += f['/'.join([self.increments[0],'materialpoint',m])].keys()
             self.mat_physics = list(set(self.mat_physics))                                          # make unique
 
+            self._index = {i:self._index_increment(f,i) for i in self.increments}
+
         self.selection = {'increments':     self.increments,
                           'constituents':   self.constituents,'materialpoints': self.materialpoints,
                           'con_physics':    self.con_physics, 'mat_physics':    self.mat_physics
                          }
 
-        self.fname = Path(fname).absolute()
-
         self._allow_modification = False
+        self._session = {'handle':None,'writers':0}                                                 # shared with views
+        self._lock = _SharedLock()
+        self._immutable = False
+        self._mappings = {}
+        self.pipeline_statistics = {}
+        self._deferred = None
+        self._chunk_size = None
+        self._executor = 'process'
+        self._cache = _LRUCache()
+        self._functions = {}
+        self._write_options = {'chunks':None,'compression':None,'compression_opts':None,'shuffle':False,'dtype':None}
+
+
+    def __enter__(self):
+        """Open a session, i.e. keep the DADF5 file open."""
+        return self.open()
+
+
+    def __exit__(self,*args):
+        """Close the session."""
+        self.close()
+
+
+    def __getstate__(self):
+        """Exclude the HDF5 file handle of an open session, the lock, the MPI communicator, and the (large) mapping cache from pickling."""
+        state = self.__dict__.copy()
+        state['_session'] = {'handle':None,'writers':0}
+        state['_mappings'] = {}
+        state['_comm'] = None
+        del state['_lock']
+        return state
+
+
+    def __setstate__(self,state):
+        self.__dict__.update(state)
+        self._lock = _SharedLock()
+
+
+    @property
+    def _handle(self):
+        """File handle of an open session."""
+        return self._session['handle']
+
+    @_handle.setter
+    def _handle(self,handle):
+        self._session['handle'] = handle
 
 
     def __repr__(self):
         """Show summary of file content."""
         all_selected_increments = self.selection['increments']
 
-        self.pick('increments',all_selected_increments[0:1])
-        first = self.list_data()
-
-        self.pick('increments',all_selected_increments[-1:])
-        last  = '' if len(all_selected_increments) < 2 else self.list_data()
-
-        self.pick('increments',all_selected_increments)
+        first = self.view(increments=all_selected_increments[0:1]).list_data()
+        last  = '' if len(all_selected_increments) < 2 else \
+                self.view(increments=all_selected_increments[-1:]).list_data()
 
         in_between = '' if len(all_selected_increments) < 3 else \
                      ''.join([f'\n{inc}\n  ...\n' for inc in all_selected_increments[1:-2]])
@@ -111,10 +840,385 @@ class Result:
         return util.srepr(first + in_between + last)
 
 
+    @staticmethod
+    def _completed_increments(f,known=[]):
+        """
+        Sorted names of the completed increments.
+
+        The solver links 'current' to the increment that is being written
+        and removes the link once the increment is finalized. The target of
+        'current' is considered incomplete unless a later increment exists.
+
+        Parameters
+        ----------
+        f : h5py.File
+            Opened DADF5 file.
+        known : list of str, optional
+            Increments to exclude.
+
+        """
+        r=re.compile('inc[0-9]+')
+        increments_unsorted = {int(i[3:]):i for i in f.keys()
+                               if r.fullmatch(i) and 'time/s' in f[i].attrs}
+        link = getattr(f,'master',f).get('current',getlink=True)
+        if isinstance(link,h5py.SoftLink):
+            current = link.path.strip('/')
+            if r.fullmatch(current) and int(current[3:]) == max(increments_unsorted,default=-1):
+                del increments_unsorted[int(current[3:])]
+        return [increments_unsorted[i] for i in sorted(increments_unsorted) if increments_unsorted[i] not in known]
+
+
+    @staticmethod
+    def _index_dataset(dataset):
+        """Shape, data type, and (decoded) attributes of a dataset."""
+        return {'shape': dataset.shape,
+                'dtype': dataset.dtype,
+                'attrs': {k:(v.decode() if isinstance(v,bytes) else v) for k,v in dataset.attrs.items()}}
+
+
+    @staticmethod
+    def _index_increment(f,inc):
+        """
+        Index the datasets of an increment.
+
+        The group tree is walked explicitly (instead of using 'visititems')
+        to follow the soft links 'constituent' and 'materialpoint'.
+
+        Parameters
+        ----------
+        f : h5py.File
+            Opened DADF5 file.
+        inc : str
+            Name of the increment.
+
+        Returns
+        -------
+        index : dict
+            Dataset information with layout {'geometry':{label:info},
+            'constituent':{name:{physics:{label:info}}}, 'materialpoint':{...}}
+
+        """
+        if isinstance(f,_Overlay):
+            index = Result._index_increment(f.master,inc)
+            if inc in f.sidecar:
+                derived = Result._index_increment(f.sidecar,inc)
+                index['geometry'].update(derived['geometry'])
+                for o in ['constituent','materialpoint']:
+                    for oo,group in derived[o].items():
+                        for pp,datasets in group.items():
+                            index[o].setdefault(oo,{}).setdefault(pp,{}).update(datasets)
+            return index
+
+        index = {'geometry':{}, 'constituent':{}, 'materialpoint':{}}
+        for label,dataset in (f[inc]['geometry'].items() if 'geometry' in f[inc] else []):
+            if isinstance(dataset,h5py.Dataset): index['geometry'][label] = Result._index_dataset(dataset)
+        for o in ['constituent','materialpoint']:
+            for oo,group in (f[inc][o].items() if o in f[inc] else []):
+                index[o][oo] = {pp:{label:Result._index_dataset(dataset) for label,dataset in physics.items()
+                                    if isinstance(dataset,h5py.Dataset)}
+                                for pp,physics in group.items() if isinstance(physics,h5py.Group)}
+        return index
+
+
+    def _index_update(self,path,dataset=None):
+        """
+        Add/update (or remove if dataset is None) the index entry for a dataset.
+
+        Parameters
+        ----------
+        path : str
+            Path of the dataset in the DADF5 file.
+        dataset : h5py.Dataset, optional
+            Dataset to index.
+
+        """
+        *group,label = path.split('/')
+        self._cache.invalidate(path)
+        node = self._index
+        for g in group:
+            node = node.setdefault(g,{})
+        if dataset is None:
+            node.pop(label,None)
+        else:
+            node[label] = self._index_dataset(dataset)
+
+
+    def _index_lookup(self,path):
+        """Index entry of a dataset."""
+        node = self._index
+        for p in path.split('/'):
+            node = node[p]
+        return node
+
+
+    def _index_datasets(self,inc,o,oo,pp):
+        """Indexed datasets of a group (empty if the group does not exist)."""
+        return self._index.get(inc,{}).get(o,{}).get(oo,{}).get(pp,{})
+
+
+    def _mapping(self,what,c=0):
+        """
+        Mapping from constituent/materialpoint data to cells.
+
+        The mapping is read only once and cached.
+
+        Parameters
+        ----------
+        what : str
+            'constituent' or 'materialpoint'.
+        c : int, optional
+            Constituent, only relevant for 'constituent'. Defaults to 0.
+
+        Returns
+        -------
+        mapping : dict
+            Pairs of cell indices and corresponding positions in the
+            data of each constituent/materialpoint name.
+
+        """
+        key = (what,c if what == 'constituent' else 0)
+        if key not in self._mappings:
+            with self._file() as f:
+                m = f[f'mapping/cellResults/{what}']
+                m = m[:,c] if what == 'constituent' else m[()]
+            names,inverse = np.unique(m['Name'],return_inverse=True)
+            cells = np.split(np.argsort(inverse,kind='stable'),np.cumsum(np.bincount(inverse))[:-1])
+            self._mappings[key] = {n.decode():(cell,m['Position'][cell]) for n,cell in zip(names,cells)}
+        return self._mappings[key]
+
+
+    def _roi_cells(self,roi):
+        """Sorted cell indices of a region of interest given as indices or mask."""
+        if roi is None:
+            return None
+        roi = np.asarray(roi)
+        return np.flatnonzero(roi) if roi.dtype == bool else np.unique(roi)
+
+
+    def _scatter_indices(self,what,name,c,cells_roi=None):
+        """
+        Rows in the (region of interest of the) cell data and corresponding positions in the data of a name.
+
+        Parameters
+        ----------
+        what : str
+            'constituent' or 'materialpoint'.
+        name : str
+            Name of the constituent/materialpoint.
+        c : int
+            Constituent.
+        cells_roi : numpy.ndarray of int, optional
+            Sorted cell indices of the region of interest. Defaults to all cells.
+
+        """
+        cells,positions = self._mapping(what,c)[name]
+        if cells_roi is None:
+            return cells,positions
+        selected = np.zeros(self.Nmaterialpoints,dtype=bool)
+        selected[cells_roi] = True
+        in_roi = selected[cells]
+        return np.searchsorted(cells_roi,cells[in_roi]),positions[in_roi]
+
+
+    @staticmethod
+    def _read_rows(dataset,rows):
+        """
+        Read selected rows of an HDF5 dataset.
+
+        Rows that are densely packed are read as a single hyperslab,
+        scattered rows are read as point selection.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+            Dataset to read from.
+        rows : numpy.ndarray of int
+            Unique indices of the rows to read.
+
+        """
+        if len(rows) == 0:
+            return np.empty((0,)+dataset.shape[1:],dtype=dataset.dtype)
+        first,last = np.min(rows),np.max(rows)
+        if last+1-first <= 4*len(rows):
+            return dataset[first:last+1][rows-first]
+        order = np.argsort(rows)
+        data = np.empty((len(rows),)+dataset.shape[1:],dtype=dataset.dtype)
+        data[order] = dataset[rows[order]]
+        return data
+
+
+    @contextmanager
+    def _file(self,mode='r'):
+        """
+        Provide access to the DADF5 file.
+
+        Within a session (see open), the persistent file handle is used.
+        Otherwise, the file is opened and closed again for reading.
+        For modification, a handle is opened that is shared with all views
+        (replacing the one of a session) until the last user is done.
+        Read access is shared with all views, only opening/closing a handle for
+        modification and writing (see _write_dataset) requires exclusive access.
+
+        Parameters
+        ----------
+        mode : str, optional
+            Access mode, 'r' (default) for reading and 'a' for modification.
+
+        """
+        if mode == 'r':
+            with self._lock.shared():
+                if self._handle is None:
+                    with self._open(mode) as f:
+                        yield f
+                else:
+                    yield self._handle
+            return
+
+        with self._lock:
+            if self._session['writers'] == 0:
+                self._session['reopen'] = self._handle is not None
+                if self._handle is not None: self._handle.close()
+                self._handle = self._open(mode)
+            self._session['writers'] += 1
+        try:
+            yield self._handle
+        finally:
+            with self._lock:
+                self._session['writers'] -= 1
+                if self._session['writers'] == 0:
+                    self._handle.close()
+                    self._handle = self._open(swmr=True) if self._session['reopen'] else None
+
+
+    def _open(self,mode='r',swmr=False):
+        """
+        Open the DADF5 file, combined with the sidecar file if used.
+
+        For reading, the DADF5 file is not locked, i.e. it can be read
+        while a running simulation has it opened for writing.
+
+        Parameters
+        ----------
+        mode : str, optional
+            Access mode, 'r' (default) for reading and 'a' for modification.
+            With a sidecar file, only the sidecar file is opened for modification.
+        swmr : bool, optional
+            Open the DADF5 file for reading in SWMR mode if supported by the file.
+            Ignored if an MPI communicator is set. Defaults to False.
+
+        """
+        mode_master = mode if self.sidecar is None else 'r'
+        options = {'locking':False} if mode_master == 'r' else {}
+        if self._comm is not None:
+            f = h5py.File(self.fname,mode_master,driver='mpio',comm=self._comm)
+            return f if self.sidecar is None else \
+                   _Overlay(f,h5py.File(self.sidecar,mode,driver='mpio',comm=self._comm))
+        try:
+            f = h5py.File(self.fname,mode_master,swmr=swmr and mode_master == 'r',**options)
+        except (OSError,ValueError):
+            if not swmr: raise
+            f = h5py.File(self.fname,mode_master,**options)
+        return f if self.sidecar is None else _Overlay(f,h5py.File(self.sidecar,mode))
+
+
+    def open(self):
+        """
+        Start a session.
+
+        Keep the DADF5 file (and the object cache of h5py) open for
+        all subsequent read access until the session is closed.
+        Can be used as a context manager: 'with Result(fname).open() as r:'.
+
+        """
+        with self._lock:
+            if self._session['writers'] > 0:
+                self._session['reopen'] = True
+            elif self._handle is None:
+                self._handle = self._open(swmr=True)
+        return self
+
+
+    def refresh(self):
+        """
+        Update to the current state of a DADF5 file that is still being written.
+
+        Only increments that were completed since the last update are indexed.
+        They are appended to the increments and added to the selection.
+        If the file cannot be read (e.g. while being written), no new
+        increments are reported and the next update tries again.
+
+        Returns
+        -------
+        increments : list of str
+            New increments.
+
+        """
+        if self._immutable:
+            raise PermissionError('Selection of a view cannot be changed')
+        with self._lock:
+            session = self._handle is not None
+            self.close()
+            try:
+                with self._open(swmr=True) as f:
+                    new = self._completed_increments(f,self.increments)
+                    index = {i:self._index_increment(f,i) for i in new}
+                    times = [round(f[i].attrs['time/s'],12) for i in new]
+            except (OSError,KeyError):                                                              # being written, retry later
+                new,index,times = [],{},[]
+            finally:
+                if session: self._handle = self._open(swmr=True)
+            self._index.update(index)
+
+        self.increments = self.increments + new
+        self.times      = self.times + times
+        self.selection['increments'] = self.selection['increments'] + new
+        return new
+
+
+    def follow(self,interval=10.0,timeout=None):
+        """
+        Yield increments of a running simulation as soon as they are completed.
+
+        Parameters
+        ----------
+        interval : float, optional
+            Time in seconds between checks for new increments. Defaults to 10.
+        timeout : float, optional
+            Stop if no new increment was completed within this time in seconds.
+            Defaults to None, i.e. follow forever.
+
+        Examples
+        --------
+        for inc in r.follow(timeout=3600):
+            r.pick('increments',inc)
+            r.add_Cauchy()
+
+        """
+        last = time.monotonic()
+        while timeout is None or time.monotonic() - last < timeout:
+            new = self.refresh()
+            if new:
+                last = time.monotonic()
+                yield from new
+            else:
+                time.sleep(interval)
+
+
+    def close(self):
+        """Close the session."""
+        with self._lock:
+            self._lock.wait_for(lambda: self._session['writers'] == 0)
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+
     def _manage_selection(self,action,what,datasets):
         """
         Manages the visibility of the groups.
 
+        Not permitted for views.
+
         Parameters
         ----------
         action : str
@@ -155,6 +1259,9 @@ class Result:
         valid = [e for e_ in [glob.fnmatch.filter(getattr(self,what),s) for s in choice] for e in e_]
         existing = set(self.selection[what])
 
+        if self._immutable:
+            raise PermissionError('Selection of a view cannot be changed')
+
         if   action == 'set':
             self.selection[what] = valid
         elif action == 'add':
@@ -167,6 +1274,40 @@ class Result:
             self.selection[what] = diff_sorted
 
 
+    def view(self,increments=None,times=None,constituents=None,materialpoints=None,con_physics=None,mat_physics=None):
+        """
+        Immutable view with a different selection.
+
+        The view shares the index, the caches, and the file handle of an
+        open session with this object, but its selection cannot be changed.
+        Views can therefore be used concurrently, e.g. in a thread pool.
+        Deferred calculations (see defer) are not shared.
+
+        Parameters
+        ----------
+        increments, times, constituents, materialpoints, con_physics, mat_physics : list of str or bool, optional
+            New selection (see pick). Defaults to the current selection.
+
+        Examples
+        --------
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            tables = executor.map(lambda i: r.view(increments=i).place('F'),r.selection['increments'])
+
+        """
+        dup = object.__new__(Result)
+        dup.__dict__.update(self.__dict__)
+        dup.selection = self.selection.copy()
+        dup._deferred = None
+        dup._functions = self._functions.copy()
+        dup._immutable = False
+        for what,datasets in [('increments',increments),('times',times),
+                              ('constituents',constituents),('materialpoints',materialpoints),
+                              ('con_physics',con_physics),('mat_physics',mat_physics)]:
+            if datasets is not None: dup._manage_selection('set',what,datasets)
+        dup._immutable = True
+        return dup
+
+
     def allow_modification(self):
         print(util.bcolors().WARNING+util.bcolors().BOLD+
               'Warning: Modification of existing datasets allowed!'+
@@ -177,6 +1318,153 @@ class Result:
         self._allow_modification = False
 
 
+    def set_chunk_size(self,N_rows=None):
+        """
+        Process add_* operations in chunks of rows (out-of-core mode).
+
+        Peak memory is then bounded by the chunk size times the number
+        of worker processes, irrespective of the size of the datasets.
+        Only suitable for pointwise calculations, i.e. not for
+        formulas in add_calculation that couple different points.
+
+        Parameters
+        ----------
+        N_rows : int, optional
+            Number of rows per chunk. Defaults to None, i.e. process each
+            dataset as a whole.
+
+        """
+        self._chunk_size = N_rows
+
+
+    def set_executor(self,executor='process'):
+        """
+        Set the parallelization of add_* operations and save_vtk.
+
+        Parameters
+        ----------
+        executor : {'process', 'thread', 'serial'}, optional
+            Pool of worker processes, to which the data is sent by pickling,
+            pool of threads working on shared memory, or serial execution.
+            Threads are beneficial for large datasets if the operations
+            release the GIL, as is the case for most NumPy operations.
+            Defaults to 'process'.
+
+        """
+        if executor not in ['process','thread','serial']:
+            raise ValueError(f'invalid executor "{executor}"')
+        self._executor = executor
+
+
+    def set_communicator(self,comm=None):
+        """
+        Distribute add_* operations and reduce over MPI ranks.
+
+        The rows of each dataset (i.e. the material points) are split into
+        contiguous slabs, one per rank. Each rank reads and calculates its slab
+        and the new datasets are written collectively with parallel HDF5.
+        Statistics calculated by reduce are combined over all ranks.
+        All ranks have to call the methods of the Result object in the same
+        order, e.g. run the same script with 'mpirun -n 4 python script.py'.
+        Requires mpi4py and h5py built with MPI support.
+
+        Parameters
+        ----------
+        comm : mpi4py.MPI.Comm, optional
+            MPI communicator, e.g. mpi4py.MPI.COMM_WORLD.
+            Defaults to None, i.e. no distribution over ranks.
+
+        """
+        if comm is not None and not h5py.get_config().mpi:
+            raise NotImplementedError('h5py is not built with MPI support')
+        with self._lock:
+            self.close()
+            self._comm = comm
+
+
+    def _slab(self,N_rows):
+        """Rows of a dataset processed by the local MPI rank."""
+        if self._comm is None: return slice(0,N_rows)
+        rank,size = self._comm.Get_rank(),self._comm.Get_size()
+        return slice(N_rows*rank//size,N_rows*(rank+1)//size)
+
+
+    def _collective(self,N_rows):
+        """Whether to use collective I/O, i.e. each MPI rank has at least one row to read/write."""
+        return self._comm is not None and N_rows >= self._comm.Get_size()
+
+
+    def set_write_options(self,chunks=None,compression=None,compression_opts=None,shuffle=False,dtype=None):
+        """
+        Set storage layout and filters of datasets written by add_* operations.
+
+        Parameters
+        ----------
+        chunks : int or bool, optional
+            Number of rows per chunk or True to let h5py guess the chunk shape.
+            Defaults to None, i.e. contiguous storage if no filter is used.
+        compression : str, optional
+            Compression filter, e.g. 'gzip' or 'lzf'. Defaults to None.
+        compression_opts : int, optional
+            Compression level, 0-9 for 'gzip'. Defaults to None.
+        shuffle : bool, optional
+            Apply the shuffle filter to improve compression. Defaults to False.
+        dtype : numpy.dtype, optional
+            Data type to store floating point data, e.g. numpy.float32 for
+            datasets used for visualization only. Defaults to None, i.e. as calculated.
+
+        """
+        self._write_options = {'chunks':chunks,'compression':compression,'compression_opts':compression_opts,
+                               'shuffle':shuffle,'dtype':dtype}
+
+
+    def repack(self):
+        """
+        Reclaim unused space.
+
+        HDF5 does not release the space of overwritten or deleted datasets.
+        The file that receives new datasets (i.e. the sidecar file if used)
+        is therefore copied object by object to a new file that replaces it.
+        """
+        with self._lock:
+            fname = self.fname if self.sidecar is None else self.sidecar
+            session = self._handle is not None
+            self.close()
+            tmp = fname.with_name(fname.name+'.repack')
+            with h5py.File(fname,'r') as f_in, h5py.File(tmp,'w') as f_out:
+                for k,v in f_in.attrs.items():
+                    f_out.attrs[k] = v
+                for name in f_in:
+                    f_in.copy(name,f_out)
+            os.replace(tmp,fname)
+            if session: self.open()
+
+
+    def set_cache_size(self,N_bytes=0):
+        """
+        Keep decoded datasets in memory for repeated access.
+
+        Results of read_dataset and datasets distributed by place are cached.
+        If the size limit is exceeded, the least recently used datasets are
+        evicted first. Cached datasets are invalidated when they are modified.
+
+        Parameters
+        ----------
+        N_bytes : int, optional
+            Size limit of the cache in bytes. Defaults to 0, i.e. no caching.
+
+        """
+        self._cache.resize(N_bytes)
+
+
+    @property
+    def cache_statistics(self):
+        """Hits, misses, and size of the cache for decoded datasets (see set_cache_size)."""
+        return {'hits':     self._cache.hits,
+                'misses':   self._cache.misses,
+                'size/MB':  self._cache.size/1024**2}
+
+
     def incs_in_range(self,start,end):
         selected = []
         for i,inc in enumerate([int(i[3:]) for i in self.increments]):
@@ -275,15 +1563,27 @@ class Result:
         name_new : str
             new name of the datasets
 
+        Notes
+        -----
+        With a sidecar file, only derived datasets (stored in the
+        sidecar file) can be renamed.
+
         """
         if self._allow_modification:
-            with h5py.File(self.fname,'a') as f:
+            with self._file('a') as f, self._lock:
+                if self.sidecar is not None:
+                    read_only = [p for p in self.get_dataset_location(name_old) if p not in f.sidecar]
+                    if read_only:
+                        raise PermissionError(f'cannot rename "{read_only[0]}", '
+                                              'it is stored in the read-only DADF5 file and not in the sidecar file')
                 for path_old in self.get_dataset_location(name_old):
                     path_new = os.path.join(os.path.dirname(path_old),name_new)
                     f[path_new] = f[path_old]
                     f[path_new].attrs['Renamed'] = f'Original name: {name_old}' if h5py3 else \
                                                    f'Original name: {name_old}'.encode()
                     del f[path_old]
+                    self._index_update(path_old)
+                    self._index_update(path_new,f[path_new])
         else:
             raise PermissionError('Rename operation not permitted')
 
@@ -291,7 +1591,7 @@ class Result:
   # def datamerger(regular expression to filter groups into one copy)
 
 
-    def place(self,datasets,component=0,tagged=False,split=True):
+    def place(self,datasets,component=0,tagged=False,split=True,roi=None):
         """
         Distribute datasets onto geometry and return Table or (split) dictionary of Tables.
 
@@ -300,7 +1600,7 @@ class Result:
         Only data within
         - inc?????/constituent/*_*/*
         - inc?????/materialpoint/*_*/*
-        - inc?????/geometry/*
+        - inc?????/geometry/* (cell data only)
         are considered.
 
         Parameters
@@ -314,47 +1614,96 @@ class Result:
           split : bool
               split Table by increment and return dictionary of Tables
               defaults to True
+          roi : numpy.ndarray of int or bool, optional
+              cell indices or mask of the region of interest (see roi)
+              defaults to all cells
 
         """
         sets = datasets if hasattr(datasets,'__iter__') and not isinstance(datasets,str) \
          else [datasets]
         tag = f'#{component}' if tagged else ''
-        tbl = {} if split else None
-        inGeom = {}
-        inData = {}
-        with h5py.File(self.fname,'r') as f:
+        columns = {}
+        cells_roi = self._roi_cells(roi)
+        N_cells = self.Nmaterialpoints if cells_roi is None else len(cells_roi)
+        with self._file() as f:
             for dataset in sets:
-                for group in self.groups_with_datasets(dataset):
+                geometry = [f'{inc}/geometry' for inc in self.selection['increments']
+                            if dataset in self._index[inc]['geometry']
+                            and self._index[inc]['geometry'][dataset]['shape'][0] == self.Nmaterialpoints]
+                for group in self.groups_with_datasets(dataset) + geometry:
                     path = os.path.join(group,dataset)
                     inc,prop,name,cat,item = (path.split('/') + ['']*5)[:5]
-                    key = '/'.join([prop,name+tag])
-                    if key not in inGeom:
-                        if prop == 'geometry':
-                            inGeom[key] = inData[key] = np.arange(self.Nmaterialpoints)
-                        elif prop == 'constituent':
-                            inGeom[key] = np.where(f['mapping/cellResults/constituent'][:,component]['Name'] == str.encode(name))[0]
-                            inData[key] =          f['mapping/cellResults/constituent'][inGeom[key],component]['Position']
-                        else:
-                            inGeom[key] = np.where(f['mapping/cellResults/materialpoint']['Name'] == str.encode(name))[0]
-                            inData[key] =          f['mapping/cellResults/materialpoint'][inGeom[key].tolist()]['Position']
-                    shape = np.shape(f[path])
-                    data = np.full((self.Nmaterialpoints,) + (shape[1:] if len(shape)>1 else (1,)),
-                                   np.nan,
-                                   dtype=np.dtype(f[path]))
-                    data[inGeom[key]] = (f[path] if len(shape)>1 else np.expand_dims(f[path],1))[inData[key]]
-                    path = (os.path.join(*([prop,name]+([cat] if cat else [])+([item] if item else []))) if split else path)+tag
-                    if split:
-                        try:
-                            tbl[inc].add(path,data)
-                        except KeyError:
-                            tbl[inc] = Table(data.reshape(self.Nmaterialpoints,-1),{path:data.shape[1:]})
+                    if prop == 'geometry':
+                        cells,positions = np.arange(N_cells),np.arange(N_cells) if cells_roi is None else cells_roi
                     else:
-                        try:
-                            tbl.add(path,data)
-                        except AttributeError:
-                            tbl = Table(data.reshape(self.Nmaterialpoints,-1),{path:data.shape[1:]})
+                        cells,positions = self._scatter_indices(prop,name,component,cells_roi)
+                    key = ('place',path,component,None if cells_roi is None else cells_roi.tobytes())
+                    data = self._cache.get(key)
+                    if data is None:
+                        shape = np.shape(f[path])
+                        data = np.full((N_cells,) + (shape[1:] if len(shape)>1 else (1,)),
+                                       np.nan,
+                                       dtype=np.dtype(f[path]))
+                        data[cells] = self._read_rows(f[path],positions).reshape((len(positions),)+data.shape[1:])
+                        self._cache.put(key,data,[path])
+                    path = (os.path.join(*([prop,name]+([cat] if cat else [])+([item] if item else []))) if split else path)+tag
+                    columns.setdefault(inc if split else None,{})[path] = data
 
-        return tbl
+        tbl = {inc:Table(pd.concat([pd.DataFrame(d.reshape(N_cells,-1)) for d in c.values()],axis=1),
+                         {path:d.shape[1:] for path,d in c.items()})
+               for inc,c in columns.items()}                                                        # assemble once, Table.add copies
+        return tbl if split else tbl.get(None)
+
+
+    def roi(self,box=None,grid_indices=None,constituents=None,materialpoints=None,mask=None,c=0):
+        """
+        Cell indices of a region of interest (ROI).
+
+        The ROI can be used to read only the data of the selected cells
+        in 'read_dataset' and 'place'. If more than one criterion is given,
+        the ROI is their intersection.
+
+        Parameters
+        ----------
+        box : numpy.ndarray of shape (2,3), optional
+            Lower and upper corner of the box containing the (initial) cell centers.
+        grid_indices : numpy.ndarray of shape (:,3), optional
+            Grid indices (x fast, z slow) of the cells. Only for structured results.
+        constituents : str or list of str, optional
+            Names of the constituents (phases) at constituent c.
+        materialpoints : str or list of str, optional
+            Names of the materialpoints (homogenizations).
+        mask : numpy.ndarray of bool, shape (Nmaterialpoints), optional
+            Selected cells.
+        c : int, optional
+            Constituent to consider for constituents. Defaults to 0.
+
+        Returns
+        -------
+        roi : numpy.ndarray of int
+            Sorted indices of the selected cells.
+
+        """
+        selected = np.ones(self.Nmaterialpoints,dtype=bool) if mask is None else np.array(mask,dtype=bool)
+
+        if box is not None:
+            x = self.cell_coordinates
+            selected &= np.all((x >= np.array(box)[0]) & (x <= np.array(box)[1]),axis=1)
+        if grid_indices is not None:
+            if not self.structured:
+                raise ValueError('Grid indices only available for structured results.')
+            ijk = np.array(grid_indices).reshape(-1,3)
+            in_grid = np.zeros_like(selected)
+            in_grid[np.ravel_multi_index(ijk.T,self.grid,order='F')] = True
+            selected &= in_grid
+        for what,names in [('constituent',constituents),('materialpoint',materialpoints)]:
+            if names is not None:
+                in_names = np.zeros_like(selected)
+                for name in [names] if isinstance(names,str) else names:
+                    in_names[self._mapping(what,c)[name][0]] = True
+                selected &= in_names
+
+        return np.flatnonzero(selected)
 
 
     def groups_with_datasets(self,datasets):
@@ -393,129 +1742,385 @@ class Result:
 
         groups = []
 
-        with h5py.File(self.fname,'r') as f:
-            for i in self.iterate('increments'):
-                for o,p in zip(['constituents','materialpoints'],['con_physics','mat_physics']):
-                    for oo in self.iterate(o):
-                        for pp in self.iterate(p):
-                            group = '/'.join([i,o[:-1],oo,pp])                                      # o[:-1]: plural/singular issue
-                            if sets is True:
-                                groups.append(group)
-                            else:
-                                if group in f.keys():
-                                    match = [e for e_ in [glob.fnmatch.filter(f[group].keys(),s) for s in sets] for e in e_]
-                                    if len(set(match)) == len(sets): groups.append(group)
+        for i in self.selection['increments']:
+            for o,p in zip(['constituents','materialpoints'],['con_physics','mat_physics']):
+                for oo in self.selection[o]:
+                    for pp in self.selection[p]:
+                        group = '/'.join([i,o[:-1],oo,pp])                                          # o[:-1]: plural/singular issue
+                        if sets is True:
+                            groups.append(group)
+                        else:
+                            labels = self._index_datasets(i,o[:-1],oo,pp)
+                            if labels:
+                                match = [e for e_ in [glob.fnmatch.filter(labels,s) for s in sets] for e in e_]
+                                if len(set(match)) == len(sets): groups.append(group)
         return groups
 
 
     def list_data(self):
         """Return information on all active datasets in the file."""
         message = ''
-        with h5py.File(self.fname,'r') as f:
-            for i in self.iterate('increments'):
-                message += f'\n{i} ({self.times[self.increments.index(i)]}s)\n'
-                for o,p in zip(['constituents','materialpoints'],['con_physics','mat_physics']):
-                    message += f'  {o[:-1]}\n'
-                    for oo in self.iterate(o):
-                        message += f'    {oo}\n'
-                        for pp in self.iterate(p):
-                            message += f'      {pp}\n'
-                            group = '/'.join([i,o[:-1],oo,pp])                                      # o[:-1]: plural/singular issue
-                            for d in f[group].keys():
-                                try:
-                                    dataset = f['/'.join([group,d])]
-                                    if 'Unit' in dataset.attrs:
-                                        unit = f" / {dataset.attrs['Unit']}" if h5py3 else \
-                                               f" / {dataset.attrs['Unit'].decode()}"
-                                    else:
-                                        unit = ''
-                                    description = dataset.attrs['Description'] if h5py3 else \
-                                                  dataset.attrs['Description'].decode()
-                                    message += f'        {d}{unit}: {description}\n'
-                                except KeyError:
-                                    pass
+        for i in self.selection['increments']:
+            message += f'\n{i} ({self.times[self.increments.index(i)]}s)\n'
+            for o,p in zip(['constituents','materialpoints'],['con_physics','mat_physics']):
+                message += f'  {o[:-1]}\n'
+                for oo in self.selection[o]:
+                    message += f'    {oo}\n'
+                    for pp in self.selection[p]:
+                        message += f'      {pp}\n'
+                        for d,info in self._index_datasets(i,o[:-1],oo,pp).items():
+                            try:
+                                unit = f" / {info['attrs']['Unit']}" if 'Unit' in info['attrs'] else ''
+                                message += f"        {d}{unit}: {info['attrs']['Description']}\n"
+                            except KeyError:
+                                pass
         return message
 
 
     def get_dataset_location(self,label):
         """Return the location of all active datasets with given label."""
         path = []
-        with h5py.File(self.fname,'r') as f:
-            for i in self.iterate('increments'):
-                k = '/'.join([i,'geometry',label])
-                try:
-                    f[k]
-                    path.append(k)
-                except KeyError:
-                    pass
-                for o,p in zip(['constituents','materialpoints'],['con_physics','mat_physics']):
-                    for oo in self.iterate(o):
-                        for pp in self.iterate(p):
-                            k = '/'.join([i,o[:-1],oo,pp,label])
-                            try:
-                                f[k]
-                                path.append(k)
-                            except KeyError:
-                                pass
+        for i in self.selection['increments']:
+            if label in self._index[i]['geometry']:
+                path.append('/'.join([i,'geometry',label]))
+            for o,p in zip(['constituents','materialpoints'],['con_physics','mat_physics']):
+                for oo in self.selection[o]:
+                    for pp in self.selection[p]:
+                        if label in self._index_datasets(i,o[:-1],oo,pp):
+                            path.append('/'.join([i,o[:-1],oo,pp,label]))
         return path
 
 
     def get_constituent_ID(self,c=0):
         """Pointwise constituent ID."""
-        with h5py.File(self.fname,'r') as f:
+        with self._file() as f:
             names = f['/mapping/cellResults/constituent']['Name'][:,c].astype('str')
         return np.array([int(n.split('_')[0]) for n in names.tolist()],dtype=np.int32)
 
 
     def get_crystal_structure(self):                                                                # ToDo: extension to multi constituents/phase
         """Info about the crystal structure."""
-        with h5py.File(self.fname,'r') as f:
-            return f[self.get_dataset_location('O')[0]].attrs['Lattice'] if h5py3 else \
-                   f[self.get_dataset_location('O')[0]].attrs['Lattice'].decode()
+        return self._index_lookup(self.get_dataset_location('O')[0])['attrs']['Lattice']
 
 
     def enable_user_function(self,func):
-        globals()[func.__name__]=func
+        """
+        Make a function available to add_calculation.
+
+        Parameters
+        ----------
+        func : function
+            Function to be called by its name in formulas. Functions that
+            cannot be pickled (e.g. local functions) are available to the
+            'process' executor only if its workers are forked.
+
+        """
+        self._functions[func.__name__] = func
         print(f'Function {func.__name__} enabled in add_calculation.')
 
 
-    def read_dataset(self,path,c=0,plain=False):
+    def read_dataset(self,path,c=0,plain=False,roi=None):
         """
         Dataset for all points/cells.
 
         If more than one path is given, the dataset is composed of the individual contributions.
+        If a region of interest (see roi) is given, only the data of the selected cells is read.
         """
-        with h5py.File(self.fname,'r') as f:
-            shape = (self.Nmaterialpoints,) + np.shape(f[path[0]])[1:]
+        cells_roi = self._roi_cells(roi)
+        key = ('read_dataset',tuple(path),c,None if cells_roi is None else cells_roi.tobytes())
+        dataset = self._cache.get(key)
+        if dataset is None:
+            dataset = self._read_dataset(path,c,cells_roi)
+            self._cache.put(key,dataset,path)
+
+        if plain and dataset.dtype.names is not None:
+            return dataset.view(('float64',len(dataset.dtype.names)))
+        else:
+            return dataset
+
+
+    def _read_dataset(self,path,c,cells_roi):
+        """Read and compose dataset (see read_dataset)."""
+        with self._file() as f:
+            shape = (self.Nmaterialpoints if cells_roi is None else len(cells_roi),) + np.shape(f[path[0]])[1:]
             if len(shape) == 1: shape = shape +(1,)
             dataset = np.full(shape,np.nan,dtype=np.dtype(f[path[0]]))
             for pa in path:
                 label = pa.split('/')[2]
 
                 if pa.split('/')[1] == 'geometry':
-                    dataset = np.array(f[pa])
+                    dataset = np.array(f[pa]) if cells_roi is None else self._read_rows(f[pa],cells_roi)
                     continue
 
-                p = np.where(f['mapping/cellResults/constituent'][:,c]['Name'] == str.encode(label))[0]
-                if len(p)>0:
-                    u = (f['mapping/cellResults/constituent']['Position'][p,c])
-                    a = np.array(f[pa])
-                    if len(a.shape) == 1:
-                        a=a.reshape([a.shape[0],1])
-                    dataset[p,:] = a[u,:]
-
-                p = np.where(f['mapping/cellResults/materialpoint']['Name'] == str.encode(label))[0]
-                if len(p)>0:
-                    u = (f['mapping/cellResults/materialpoint']['Position'][p.tolist()])
-                    a = np.array(f[pa])
-                    if len(a.shape) == 1:
-                        a=a.reshape([a.shape[0],1])
-                    dataset[p,:] = a[u,:]
+                for what in ['constituent','materialpoint']:
+                    if label in self._mapping(what,c):
+                        cells,positions = self._scatter_indices(what,label,c,cells_roi)
+                        dataset[cells,:] = self._read_rows(f[pa],positions).reshape((len(positions),)+shape[1:])
+
+        return dataset
+
+    def probe(self,points,labels,c=0):
+        """
+        Time series of datasets at selected cells ('virtual strain gauges').
+
+        The cells are identified once and only their data is read from
+        each selected increment. Increments are read concurrently.
+
+        Parameters
+        ----------
+        points : numpy.ndarray of int, shape (:), or of float, shape (:,3)
+            Cell indices or coordinates. Coordinates are mapped to the
+            cell with the closest (initial) center.
+        labels : str or list of str
+            Labels of the datasets.
+        c : int, optional
+            Constituent to consider for constituent data. Defaults to 0.
+
+        Returns
+        -------
+        probes : dict
+            Data of shape (N_increments,N_points,...) for each label.
+            Increments without the dataset are filled with NaN.
+
+        """
+        p = np.asarray(points)
+        cells = p if np.issubdtype(p.dtype,np.integer) else \
+                spatial.cKDTree(self.cell_coordinates).query(p.reshape(-1,3))[1]
+        cells_roi,rows = np.unique(cells,return_inverse=True)
+
+        probes = {}
+        for label in [labels] if isinstance(labels,str) else labels:
+            locations = {inc:[] for inc in self.selection['increments']}
+            for path in self.get_dataset_location(label):
+                locations[path.split('/')[0]].append(path)
+
+            def read(inc):
+                return self.read_dataset(locations[inc],c,roi=cells_roi)[rows] if locations[inc] else None
+
+            with util._executor('thread') as executor:
+                series = list(executor.map(read,self.selection['increments']))
+            if all(s is None for s in series): continue
+            template = next(s for s in series if s is not None)
+            probes[label] = np.stack([np.full_like(template,np.nan) if s is None else s for s in series])
+
+        return probes
+
+
+    def reduce(self,label,ops=['mean','std','min','max'],by='increment',bins=100,bin_range=None,chunk_size=2**20):
+        """
+        Statistics of a dataset without loading it as a whole.
+
+        The data is streamed in chunks of rows that are reduced
+        concurrently into mergeable accumulators.
+        With an MPI communicator (see set_communicator), each rank
+        reduces its slab and the accumulators of all ranks are merged.
+
+        Parameters
+        ----------
+        label : str
+            Label of the dataset.
+        ops : list of str, optional
+            Statistics to calculate. Select from 'count', 'mean', 'std',
+            'min', 'max', 'histogram', and percentiles 'p<q>', e.g. 'p50'
+            for the median. Percentiles are approximate (relative rank error
+            of the order 1e-3). Defaults to ['mean','std','min','max'].
+        by : {'increment', 'phase'}, optional
+            Reduce per increment or per increment and constituent/materialpoint.
+            Defaults to 'increment'.
+        bins : int, optional
+            Number of bins of the histogram. Defaults to 100.
+        bin_range : tuple of float, optional
+            Lower and upper edge of the histogram. Defaults to the range of the data.
+        chunk_size : int, optional
+            Number of rows per chunk. Defaults to 2**20.
+
+        Returns
+        -------
+        statistics : dict
+            Requested statistics (histograms as counts and bin edges) for each
+            increment or (increment,name) pair.
+
+        """
+        if by not in ['increment','phase']:
+            raise ValueError(f'invalid grouping {by}')
+        key = (lambda path: path.split('/')[0]) if by == 'increment' else \
+              (lambda path: (path.split('/')[0],path.split('/')[2]))
+
+        chunks = [(path,slice(s,min(s+chunk_size,slab.stop)))
+                  for path in self.get_dataset_location(label)
+                  for slab in [self._slab(self._index_lookup(path)['shape'][0])]
+                  for s in range(slab.start,slab.stop,chunk_size)]
+
+        def accumulate(accumulator):
+            def read_and_accumulate(chunk):
+                x = f[chunk[0]][chunk[1]]
+                if x.dtype.names is not None: x = rfn.structured_to_unstructured(x)
+                return key(chunk[0]),accumulator(key(chunk[0]),x)
+            accumulated = executor.map(read_and_accumulate,chunks)
+            if self._comm is not None:                                                              # allreduce, merged in the same order on all ranks
+                accumulated = [k_a for r in self._comm.allgather(list(accumulated)) for k_a in r]
+            reduced = {}
+            for k,a in accumulated:
+                reduced[k] = reduced[k].merge(a) if k in reduced else a
+            return reduced
+
+        quantiles = [op for op in ops if re.fullmatch(r'p[0-9.]+',op)]
+        with self._file() as f, util._executor('thread') as executor:
+            moments  = accumulate(lambda k,x: util._Moments(x))
+            sketches = accumulate(lambda k,x: util._QuantileSketch(x)) if quantiles else {}
+            if 'histogram' in ops:
+                edges = {k:np.linspace(*(bin_range if bin_range is not None else (np.min(m.min),np.max(m.max))),bins+1)
+                         for k,m in moments.items()}
+                histograms = accumulate(lambda k,x: util._Histogram(edges[k],x))
+
+        statistics = {}
+        for k,m in moments.items():
+            statistics[k] = {}
+            for op in ops:
+                if   op == 'count':     statistics[k][op] = m.count
+                elif op == 'mean':      statistics[k][op] = m.mean
+                elif op == 'std':       statistics[k][op] = m.std
+                elif op == 'min':       statistics[k][op] = m.min
+                elif op == 'max':       statistics[k][op] = m.max
+                elif op == 'histogram': statistics[k][op] = (histograms[k].counts,histograms[k].bins)
+                elif op in quantiles:   statistics[k][op] = sketches[k].quantile(float(op[1:])*.01)
+                else:
+                    raise ValueError(f'invalid operation {op}')
+        return statistics
+
+
+    def groupby(self,by,c=0):
+        """
+        Group the cells for reductions per group and increment.
+
+        Parameters
+        ----------
+        by : {'phase', 'homogenization'} or numpy.ndarray
+            Group by name of the phase (constituent) or homogenization (materialpoint),
+            or by a key per cell, e.g. the material IDs of the geometry.
+        c : int, optional
+            Constituent to consider. Defaults to 0.
+
+        Returns
+        -------
+        grouped : object
+            Provides 'count', 'sum', 'mean', 'std', 'min', and 'max' of a dataset
+            for the groups in 'keys' (sorted).
+
+        Examples
+        --------
+        Average stress per grain:
+
+        >>> r = damask.Result('my_file.hdf5')
+        >>> material = damask.Geom.load('my_geom.vtr').material.flatten(order='F')
+        >>> sigma = r.groupby(material).mean('sigma')
+
+        """
+        return _GroupBy(self,by,c)
+
+
+    def compare(self,other,rtol=1e-5,atol=1e-8,labels=None,chunk_size=2**20,early_exit=True):
+        """
+        Compare the datasets to those of another DADF5 file, e.g. for regression testing.
+
+        Datasets are matched by their path in the selected increments, geometry,
+        and constituents/materialpoints. Increments, constituents/materialpoints,
+        and physics that exist only in the other file are also considered, i.e.
+        datasets that exist in only one of the files are reported as missing.
+        After checking shape, data type, and
+        attributes (except for 'Created' and 'Creator'), the data is compared
+        in chunks of rows, i.e. the memory requirement is bounded.
+        Chunks with identical content are skipped without further calculation.
+
+        Parameters
+        ----------
+        other : damask.Result or str or pathlib.Path
+            DADF5 file to compare to (the reference).
+        rtol : float, optional
+            Relative tolerance (see numpy.allclose). Defaults to 1e-5.
+        atol : float, optional
+            Absolute tolerance (see numpy.allclose). Defaults to 1e-8.
+        labels : str or list of str, optional
+            Labels of the datasets to compare, supports ? and * wildcards.
+            Defaults to None, i.e. all datasets.
+        chunk_size : int, optional
+            Number of rows per chunk. Defaults to 2**20.
+        early_exit : bool, optional
+            Stop at the first difference. Defaults to True.
+
+        Returns
+        -------
+        report : dict
+            For each compared dataset (path): 'equal', 'max abs error',
+            'max rel error', and 'message' explaining a structural difference.
+            The errors of a dataset with early exit refer to the rows read so far.
+
+        """
+        other   = other if isinstance(other,Result) else Result(other)
+        labels_ = None if labels is None else [labels] if isinstance(labels,str) else labels
+        volatile = ['Created','Creator']
+
+        def compare_dataset(a,b,entry):
+            for s in range(0,a.shape[0] if a.shape else 1,chunk_size):
+                x = a[s:s+chunk_size] if a.shape else a[()]
+                y = b[s:s+chunk_size] if b.shape else b[()]
+                if x.dtype.names is not None: x,y = rfn.structured_to_unstructured(x),rfn.structured_to_unstructured(y)
+                if np.array_equal(x,y): continue
+                if not np.issubdtype(x.dtype,np.number):
+                    entry['equal'],entry['message'] = False,'different content'
+                    return
+                x,y = np.asarray(x,dtype=float),np.asarray(y,dtype=float)
+                both_nan = np.isnan(x) & np.isnan(y)
+                diff = np.where(both_nan,0.0,np.abs(x-y))
+                rel  = np.divide(diff,np.abs(y),out=np.where(diff>0,np.inf,0.0),where=y!=0)
+                entry['max abs error'] = max(entry['max abs error'],float(np.max(diff,initial=0.0)))
+                entry['max rel error'] = max(entry['max rel error'],float(np.max(rel,initial=0.0)))
+                if not np.allclose(x,y,rtol=rtol,atol=atol,equal_nan=True):
+                    entry['equal'] = False
+                    if early_exit: return
+
+        def selected(key,x):
+            """Selected in this file or not existing in it."""
+            return x in self.selection[key] or x not in getattr(self,key)
+
+        def groups(r):
+            """Indexed datasets of the selected groups, including geometry."""
+            groups = {}
+            for inc in filter(lambda i: selected('increments',i),r.increments):
+                groups[f'{inc}/geometry'] = r._index[inc]['geometry']
+                for o,p in zip(['constituent','materialpoint'],['con_physics','mat_physics']):
+                    for oo in filter(lambda n: selected(o+'s',n),r._index[inc][o]):
+                        for pp in filter(lambda n: selected(p,n),r._index[inc][o][oo]):
+                            groups['/'.join([inc,o,oo,pp])] = r._index[inc][o][oo][pp]
+            return groups
+
+        report = {}
+        groups_mine,groups_theirs = groups(self),groups(other)
+        with self._file() as f, other._file() as g:
+            for group in sorted(set(groups_mine) | set(groups_theirs),key=lambda g: (int(g.split('/')[0][3:]),g)):
+                mine,theirs = groups_mine.get(group,{}),groups_theirs.get(group,{})
+                for label in sorted(set(mine) | set(theirs)):
+                    if labels_ is not None and not any(glob.fnmatch.fnmatch(label,l) for l in labels_): continue
+                    path = group+'/'+label
+                    entry = report[path] = {'equal':True,'max abs error':0.0,'max rel error':0.0,'message':''}
+                    if label not in theirs:
+                        entry['message'] = 'missing in other'
+                    elif label not in mine:
+                        entry['message'] = 'missing'
+                    elif mine[label]['shape'] != theirs[label]['shape']:
+                        entry['message'] = f"shape {mine[label]['shape']} != {theirs[label]['shape']}"
+                    elif mine[label]['dtype'] != theirs[label]['dtype']:
+                        entry['message'] = f"data type {mine[label]['dtype']} != {theirs[label]['dtype']}"
+                    elif any(str(mine[label]['attrs'].get(k)) != str(theirs[label]['attrs'].get(k))
+                             for k in set(mine[label]['attrs']) | set(theirs[label]['attrs']) if k not in volatile):
+                        entry['message'] = 'different attributes'
+                    else:
+                        compare_dataset(f[path],g[path],entry)
+                    if entry['message']: entry['equal'] = False
+                    if early_exit and not entry['equal']: return report
+
+        return report
 
-        if plain and dataset.dtype.names is not None:
-            return dataset.view(('float64',len(dataset.dtype.names)))
-        else:
-            return dataset
 
     @property
     def cell_coordinates(self):
@@ -523,7 +2128,7 @@ class Result:
         if self.structured:
             return grid_filters.cell_coord0(self.grid,self.size,self.origin).reshape(-1,3,order='F')
         else:
-            with h5py.File(self.fname,'r') as f:
+            with self._file() as f:
                 return f['geometry/x_c'][()]
 
     @property
@@ -532,10 +2137,49 @@ class Result:
         if self.structured:
             return grid_filters.node_coord0(self.grid,self.size,self.origin).reshape(-1,3,order='F')
         else:
-            with h5py.File(self.fname,'r') as f:
+            with self._file() as f:
                 return f['geometry/x_n'][()]
 
 
+    def deformed_coordinates(self,inc,mode='cell',F='F'):
+        """
+        Coordinates of the cell centers or nodes in the deformed configuration.
+
+        The displacement written by the solver ('u_p' or 'u_n') is used if available.
+        Otherwise, the displacement calculated from the deformation gradient is taken
+        from the DADF5 file. It is calculated and stored on first use (see add_displacement).
+
+        Parameters
+        ----------
+        inc : str
+            Name of the increment, e.g. 'inc10'.
+        mode : {'cell', 'node'}, optional
+            Coordinates of the cell centers or nodes. Defaults to 'cell'.
+        F : str, optional
+            Label of deformation gradient dataset to calculate the displacement
+            if not available. Defaults to 'F'.
+
+        Returns
+        -------
+        x : numpy.ndarray of shape (:,3)
+            Deformed coordinates.
+
+        """
+        if mode not in ['cell','node']:
+            raise ValueError(f'invalid mode "{mode}"')
+        u = 'u_p' if mode == 'cell' else 'u_n'
+        geometry = self._index[inc]['geometry']
+        label = u if u in geometry else f'{u}({F})'
+        if label not in geometry:
+            self.view(increments=inc).add_displacement(F,mode)
+        if label not in geometry:
+            raise ValueError(f'displacement not available for {inc}')
+
+        with self._file() as f:
+            return (self.cell_coordinates if mode == 'cell' else self.node_coordinates) \
+                   + f[f'{inc}/geometry/{label}'][()]
+
+
     @staticmethod
     def _add_absolute(x):
         return {
@@ -563,15 +2207,13 @@ class Result:
     @staticmethod
     def _add_calculation(**kwargs):
         formula = kwargs['formula']
-        for d in re.findall(r'#(.*?)#',formula):
-            formula = formula.replace(f'#{d}#',f"kwargs['{d}']['data']")
 
         return {
-                'data':  eval(formula),
+                'data':  formula({d:kwargs[d]['data'] for d in formula.labels}),
                 'label': kwargs['label'],
                 'meta':  {
                           'Unit':        kwargs['unit'],
-                          'Description': f"{kwargs['description']} (formula: {kwargs['formula']})",
+                          'Description': f"{kwargs['description']} (formula: {formula.formula})",
                           'Creator':     'add_calculation'
                           }
                  }
@@ -585,13 +2227,23 @@ class Result:
           Label of resulting dataset.
         formula : str
             Formula to calculate resulting dataset. Existing datasets are referenced by ‘#TheirLabel#‘.
+            Available are NumPy ('np'), damask.mechanics ('mechanics'), Rotation, Orientation,
+            built-in functions, and user functions (see enable_user_function).
+            Formulas consisting of arithmetic operations, comparisons, NumPy ufuncs, and indexing
+            along the trailing dimensions are evaluated in cache-sized blocks of rows.
+            Unknown names and syntax errors are reported immediately.
         unit : str, optional
             Physical unit of the result.
         description : str, optional
             Human-readable description of the result.
 
         """
-        dataset_mapping  = {d:d for d in set(re.findall(r'#(.*?)#',formula))}                       # datasets used in the formula
+        formula = _Formula(formula,self._functions)
+        if self._deferred is None:                                                                  # deferred calculations might provide input
+            for d in formula.labels:
+                if not self.get_dataset_location(d):
+                    raise ValueError(f'dataset "{d}" not found')
+        dataset_mapping  = {d:d for d in formula.labels}                                            # datasets used in the formula
         args             = {'formula':formula,'label':label,'unit':unit,'description':description}
         self._add_generic_pointwise(self._add_calculation,dataset_mapping,args)
 
@@ -624,6 +2276,33 @@ class Result:
         self._add_generic_pointwise(self._add_Cauchy,{'P':P,'F':F})
 
 
+    @staticmethod
+    def _add_curl(f,k_s,workers):
+        return {
+                'data':  grid_filters._curl(k_s,f['data'],workers),
+                'label': f"curl({f['label']})",
+                'meta':  {
+                          'Unit':        f"{f['meta']['Unit']}/m",
+                          'Description': f"Curl of {f['label']} ({f['meta']['Description']})",
+                          'Creator':     'add_curl'
+                          }
+                }
+    def add_curl(self,f):
+        """
+        Add curl of a field.
+
+        Only available for grid results. The field is composed
+        from the data of all constituents/materialpoints.
+
+        Parameters
+        ----------
+        f : str
+            Label of vector or tensor field.
+
+        """
+        self._add_generic_grid(self._add_curl,{'f':f})
+
+
     @staticmethod
     def _add_determinant(T):
         return {
@@ -672,6 +2351,90 @@ class Result:
         self._add_generic_pointwise(self._add_deviator,{'T':T})
 
 
+    def add_displacement(self,F='F',mode='cell'):
+        """
+        Add the displacement of the cell centers or nodes calculated from the deformation gradient.
+
+        Only available for grid results. The homogenized deformation gradient
+        (materialpoint) is used if available, otherwise the one of the first constituent.
+        Increments for which the displacement has already been added are skipped.
+
+        Parameters
+        ----------
+        F : str, optional
+            Label of deformation gradient dataset. Defaults to 'F'.
+        mode : {'cell', 'node'}, optional
+            Displacement of the cell centers ('u_p(F)') or nodes ('u_n(F)').
+            Defaults to 'cell'.
+
+        """
+        if not self.structured:
+            raise NotImplementedError('Displacement only available for grid results.')
+        if mode not in ['cell','node']:
+            raise ValueError(f'invalid mode "{mode}"')
+
+        label = f"u_{'p' if mode == 'cell' else 'n'}({F})"
+        grid = tuple(self.grid)
+        k_s = grid_filters._ks(self.size,grid,False)
+        workers = grid_filters._workers()
+        self.pipeline_statistics = {stage:{'time/s':0.0,'size/MB':0.0,'throughput/(MB/s)':0.0}
+                                    for stage in ['read','compute','write']}
+
+        for inc in util.show_progress(self.selection['increments']):
+            if label in self._index[inc]['geometry'] and not self._allow_modification: continue
+            view = self.view(increments=inc)
+            paths = view.get_dataset_location(F)
+            paths = [p for p in paths if p.split('/')[1] == 'materialpoint'] or paths
+            F_ = view._read_field(paths) if paths else None
+            if F_ is None:
+                print(f'Could not add dataset: "{F}" is not defined for all cells of {inc}.')
+                continue
+
+            start = time.perf_counter()
+            u = grid_filters._cell_displacement_fluct(k_s,self.size,F_,workers)
+            u = grid_filters.cell_displacement_avg(self.size,F_) + u if mode == 'cell' else \
+                grid_filters.node_displacement_avg(self.size,F_) + grid_filters.cell_2_node(u)
+            self._tally('compute',time.perf_counter()-start,u.nbytes)
+            with self._file('a') as f:
+                self._write_dataset(f,f'{inc}/geometry',
+                                    {'data':  u.reshape(-1,3,order='F'),
+                                     'label': label,
+                                     'meta':  {
+                                               'Unit':        'm',
+                                               'Description': f"Displacement of the {'cell centers' if mode == 'cell' else 'nodes'}"
+                                                              f" from deformation gradient {F}",
+                                               'Creator':     'add_displacement'
+                                              }
+                                    })
+
+
+    @staticmethod
+    def _add_divergence(f,k_s,workers):
+        return {
+                'data':  grid_filters._divergence(k_s,f['data'],workers),
+                'label': f"div({f['label']})",
+                'meta':  {
+                          'Unit':        f"{f['meta']['Unit']}/m",
+                          'Description': f"Divergence of {f['label']} ({f['meta']['Description']})",
+                          'Creator':     'add_divergence'
+                          }
+                }
+    def add_divergence(self,f):
+        """
+        Add divergence of a field.
+
+        Only available for grid results. The field is composed
+        from the data of all constituents/materialpoints.
+
+        Parameters
+        ----------
+        f : str
+            Label of vector or tensor field.
+
+        """
+        self._add_generic_grid(self._add_divergence,{'f':f})
+
+
     @staticmethod
     def _add_eigenvalue(T_sym,eigenvalue):
         if   eigenvalue == 'max':
@@ -739,6 +2502,33 @@ class Result:
         self._add_generic_pointwise(self._add_eigenvector,{'T_sym':T_sym},{'eigenvalue':eigenvalue})
 
 
+    @staticmethod
+    def _add_gradient(f,k_s,workers):
+        return {
+                'data':  grid_filters._gradient(k_s,f['data'],workers),
+                'label': f"grad({f['label']})",
+                'meta':  {
+                          'Unit':        f"{f['meta']['Unit']}/m",
+                          'Description': f"Gradient of {f['label']} ({f['meta']['Description']})",
+                          'Creator':     'add_gradient'
+                          }
+                }
+    def add_gradient(self,f):
+        """
+        Add gradient of a field.
+
+        Only available for grid results. The field is composed
+        from the data of all constituents/materialpoints.
+
+        Parameters
+        ----------
+        f : str
+            Label of scalar or vector field.
+
+        """
+        self._add_generic_grid(self._add_gradient,{'f':f})
+
+
     @staticmethod
     def _add_IPF_color(q,l):
         m = util.scale_to_coprime(np.array(l))
@@ -1042,23 +2832,189 @@ class Result:
         self._add_generic_pointwise(self._add_stretch_tensor,{'F':F},{'t':t})
 
 
-    def _job(self,group,func,datasets,args,lock):
-        """Execute job for _add_generic_pointwise."""
+    def defer(self):
+        """
+        Defer the calculation of new datasets.
+
+        Subsequent add_* calls are only recorded. They are evaluated
+        together by 'compute' in a single pass over the DADF5 file.
+
+        """
+        self._deferred = []
+
+
+    def compute(self):
+        """
+        Evaluate all deferred add_* calls (see defer).
+
+        Each input dataset is read only once per group, and new
+        datasets that serve as input to other calculations (e.g.
+        the Cauchy stress for its Mises equivalent) are taken from
+        memory. The order of the add_* calls is therefore irrelevant.
+
+        """
+        operations,self._deferred = self._deferred,None
+        if operations: self._process(operations)
+
+
+    @staticmethod
+    def _job(group,datasets_in,operations):
+        """
+        Execute job for _add_generic_pointwise (compute stage).
+
+        Each operation is executed once all of its input is available,
+        i.e. read from file or calculated by another operation. An
+        operation is repeated if another operation later overwrites
+        one of the datasets it has read from file (see allow_modification).
+
+        Returns
+        -------
+        job : list
+            Group, results, time spent, and indices of the operations
+            that were not executed because their input is missing.
+
+        """
+        start = time.perf_counter()
+        calculated = {}
+        results,consumed = {},{}
+        pending = list(range(len(operations)))
+        while True:
+            ready = [i for i in pending if set(operations[i][1].values()) <= datasets_in.keys()|calculated.keys()]
+            if not ready: break
+            pending = [i for i in pending if i not in ready]
+            for i in ready:
+                func,datasets,args = operations[i]
+                consumed[i] = {label for label in datasets.values() if label not in calculated}
+                try:
+                    r = func(**{arg:calculated.get(label,datasets_in.get(label)) for arg,label in datasets.items()},
+                             **args)
+                except Exception as err:
+                    print(f'Error during calculation: {err}.')
+                    continue
+                calculated[r['label']] = results[i] = r
+                for j in [j for j,labels in consumed.items() if j != i and r['label'] in labels]:
+                    del consumed[j]                                                                 # used outdated data from file
+                    results.pop(j,None)
+                    pending.append(j)
+        return [group,list(results.values()),time.perf_counter()-start,pending]
+
+
+    def _read_groups(self,f,jobs,buffer,stop):
+        """
+        Read input datasets of all groups for _add_generic_pointwise (reader stage).
+
+        Parameters
+        ----------
+        f : h5py.File
+            Opened DADF5 file.
+        jobs : list of (str, slice, list of str)
+            Groups, rows, and labels of the datasets to read from them.
+        buffer : queue.Queue
+            Bounded queue to put the data of each group. None signals the end,
+            an exception is passed on to the consumer.
+        stop : threading.Event
+            Signal to stop reading, e.g. because the consumer failed.
+
+        """
         try:
-            datasets_in = {}
-            lock.acquire()
-            with h5py.File(self.fname,'r') as f:
-                for arg,label in datasets.items():
-                    loc  = f[group+'/'+label]
-                    datasets_in[arg]={'data' :loc[()],
-                                      'label':label,
-                                      'meta': {k:(v if h5py3 else v.decode()) for k,v in loc.attrs.items()}}
-            lock.release()
-            r = func(**datasets_in,**args)
-            return [group,r]
+            for group,rows,labels in jobs:
+                if stop.is_set(): return
+                start = time.perf_counter()
+                datasets_in = {}
+                for label in labels:
+                    path = group+'/'+label
+                    datasets_in[label]={'data' :f[path][rows],
+                                        'label':label,
+                                        'meta': self._index_lookup(path)['attrs']}
+                self._tally('read',time.perf_counter()-start,sum(d['data'].nbytes for d in datasets_in.values()))
+                buffer.put(((group,rows),datasets_in))
+            buffer.put(None)
         except Exception as err:
-            print(f'Error during calculation: {err}.')
-            return None
+            buffer.put(err)
+
+
+    def _write_dataset(self,f,group,result,rows=slice(None),N_rows=None,written=None,chunk_rows=None):
+        """
+        Write dataset calculated by _add_generic_pointwise (writer stage).
+
+        Parameters
+        ----------
+        f : h5py.File
+            DADF5 file opened for modification.
+        group : str
+            Group to write to.
+        result : dictionary
+            Result of callback function with 'data', 'label', and 'meta'.
+        rows : slice, optional
+            Rows to write if the data is processed in chunks. Defaults to all.
+        N_rows : int, optional
+            Total number of rows if the data is processed in chunks.
+        written : set, optional
+            Paths of the datasets already (partially) written by the current
+            operation. Required if the data is processed in chunks.
+        chunk_rows : int, optional
+            Number of rows per chunk of a new dataset if the data is processed
+            in chunks and no chunk size is set (see set_write_options).
+            Defaults to the number of rows of the first chunk.
+
+        """
+        with self._lock:                                                                            # exclusive, views might read
+            start = time.perf_counter()
+            path = group+'/'+result['label']
+            written = set() if written is None else written
+            if path in written:
+                f[path][rows] = result['data']
+                self._tally('write',time.perf_counter()-start,np.asarray(result['data']).nbytes)
+                return
+            try:
+                data = np.asarray(result['data'])
+                options = {k:v for k,v in self._write_options.items() if k != 'chunks'}
+                if options['dtype'] is None or not np.issubdtype(data.dtype,np.floating):
+                    options['dtype'] = data.dtype
+                chunks = self._write_options['chunks']
+                if isinstance(chunks,(int,np.integer)) and not isinstance(chunks,bool):
+                    chunks = (min(max(chunks,1),N_rows if N_rows is not None else max(len(data),1)),)+data.shape[1:]
+                if self._allow_modification and path in f:
+                    dataset = f[path]
+                    with dataset.collective if self._collective(N_rows or 0) else nullcontext():
+                        dataset[rows] = data
+                    dataset.attrs['Overwritten'] = 'Yes' if h5py3 else \
+                                                   'Yes'.encode()
+                elif N_rows is None:
+                    dataset = f.create_dataset(path,data=data,chunks=chunks,**options)
+                else:
+                    dataset = f.create_dataset(path,shape=(N_rows,)+data.shape[1:],
+                                               chunks=chunks or (min(max(chunk_rows or len(data),1),N_rows),)+data.shape[1:],
+                                               **options)
+                    with dataset.collective if self._collective(N_rows) else nullcontext():
+                        dataset[rows] = data
+                written.add(path)
+
+                now = datetime.datetime.now().astimezone()
+                if self._comm is not None: now = self._comm.bcast(now)                              # attributes must be identical on all ranks
+                dataset.attrs['Created'] = now.strftime('%Y-%m-%d %H:%M:%S%z') if h5py3 else \
+                                           now.strftime('%Y-%m-%d %H:%M:%S%z').encode()
+
+                for l,v in result['meta'].items():
+                    dataset.attrs[l]=v if h5py3 else v.encode()
+                creator = dataset.attrs['Creator'] if h5py3 else \
+                          dataset.attrs['Creator'].decode()
+                dataset.attrs['Creator'] = f"damask.Result.{creator} v{damask.version}" if h5py3 else \
+                                           f"damask.Result.{creator} v{damask.version}".encode()
+
+                self._index_update(group+'/'+result['label'],dataset)
+
+            except (OSError,RuntimeError) as err:
+                print(f'Could not add dataset: {err}.')
+            self._tally('write',time.perf_counter()-start,np.asarray(result['data']).nbytes)
+
+
+    def _tally(self,stage,duration,nbytes):
+        """Accumulate time and data volume of a pipeline stage."""
+        self.pipeline_statistics[stage]['time/s'] += duration
+        self.pipeline_statistics[stage]['size/MB'] += nbytes/1024**2
+        t = self.pipeline_statistics[stage]['time/s']
+        self.pipeline_statistics[stage]['throughput/(MB/s)'] = self.pipeline_statistics[stage]['size/MB']/t if t > 0 else np.inf
 
 
     def _add_generic_pointwise(self,func,datasets,args={}):
@@ -1077,48 +3033,307 @@ class Result:
             Arguments parsed to func.
 
         """
-        num_threads = damask.environment.options['DAMASK_NUM_THREADS']
-        pool = mp.Pool(int(num_threads) if num_threads is not None else None)
-        lock = mp.Manager().Lock()
+        if self._deferred is not None:
+            self._deferred.append((func,datasets,args))
+        else:
+            self._process([(func,datasets,args)])
+
+
+    def _read_field(self,paths,c=0):
+        """
+        Dataset composed from all constituents/materialpoints and arranged on the grid.
+
+        Parameters
+        ----------
+        paths : list of str
+            Paths of the datasets in one increment.
+        c : int, optional
+            Constituent. Defaults to 0.
+
+        Returns
+        -------
+        field : numpy.ndarray of shape (:,:,:,...) or None
+            Field on the grid, None if the dataset is not defined for all cells.
+
+        """
+        grid = tuple(self.grid)
+        x = self.read_dataset(paths,c)
+        if x.shape[0] != self.Nmaterialpoints or x.dtype.names is not None or np.isnan(x).any():
+            return None
+        return x.reshape(len(x),-1).reshape(grid+(-1,),order='F').reshape(grid+x.shape[1:])
+
+
+    def _add_generic_grid(self,func,datasets,args={}):
+        """
+        General function to add data calculated on the regular grid, e.g. spatial derivatives.
+
+        For each selected increment (and constituent), the data of all
+        constituents/materialpoints is composed into a field on the grid.
+        The new field calculated by func is split accordingly and written
+        to the groups of the input dataset. The wave numbers of the grid
+        are calculated only once and shared by all increments.
+        The calculation is not deferred (see defer).
+
+        Parameters
+        ----------
+        func : function
+            Callback function that calculates a new dataset from a field on the grid.
+            It receives the wave numbers 'k_s' and the number of threads 'workers'
+            for the Fourier transforms as additional arguments.
+        datasets : dictionary
+            Details of the dataset to be used: label (in HDF5 file) and
+            arg (argument to which the data is parsed in func).
+        args : dictionary, optional
+            Arguments parsed to func.
+
+        """
+        if not self.structured:
+            raise NotImplementedError('Grid operations only available for grid results.')
+
+        (arg,label), = datasets.items()
+        grid = tuple(self.grid)
+        k_s = grid_filters._ks(self.size,grid,True)
+        workers = grid_filters._workers()
+        self.pipeline_statistics = {stage:{'time/s':0.0,'size/MB':0.0,'throughput/(MB/s)':0.0}
+                                    for stage in ['read','compute','write']}
+
+        found = False
+        for inc in util.show_progress(self.selection['increments']):
+            view = self.view(increments=inc)
+            for what in ['geometry','constituent','materialpoint']:
+                paths = [p for p in view.get_dataset_location(label) if p.split('/')[1] == what]
+                if not paths: continue
+                found = True
+                new = {}
+                for c in range(self.Nconstituents if what == 'constituent' else 1):
+                    start = time.perf_counter()
+                    x = view._read_field(paths,c)
+                    if x is None:
+                        print(f'Could not add dataset: "{label}" is not defined for all cells.')
+                        new = {}
+                        break
+                    self._tally('read',time.perf_counter()-start,x.nbytes)
+
+                    start = time.perf_counter()
+                    field = {'data':  x,
+                             'label': label,
+                             'meta':  self._index_lookup(paths[0])['attrs']}
+                    r = func(**{arg:field},k_s=k_s,workers=workers,**args)
+                    shape = r['data'].shape[3:]
+                    data = r['data'].reshape(grid+(-1,)).reshape(-1,int(np.prod(shape)),order='F').reshape((-1,)+shape)
+                    self._tally('compute',time.perf_counter()-start,data.nbytes)
+
+                    for path in paths:
+                        group = path.rsplit('/',1)[0]
+                        if group not in new:
+                            N_rows = self._index_lookup(path)['shape'][0]
+                            new[group] = {'data':np.empty((N_rows,)+shape),'label':r['label'],'meta':r['meta']}
+                        if what == 'geometry':
+                            new[group]['data'][...] = data
+                        else:
+                            cells,positions = self._mapping(what,c).get(path.split('/')[2],([],[]))
+                            new[group]['data'][positions] = data[cells]
+
+                with self._file('a') as f:
+                    for group,result in new.items():
+                        self._write_dataset(f,group,result)
 
-        groups = self.groups_with_datasets(datasets.values())
-        if len(groups) == 0:
+        if not found:
             print('No matching dataset found, no data was added.')
-            return
 
-        default_arg = partial(self._job,func=func,datasets=datasets,args=args,lock=lock)
 
-        for result in util.show_progress(pool.imap_unordered(default_arg,groups),len(groups)):
-            if not result:
-                continue
-            lock.acquire()
-            with h5py.File(self.fname, 'a') as f:
+    def _process(self,operations,pool=None):
+        """
+        Calculate and store new pointwise datasets.
+
+        The data is processed in a pipeline: A reader thread prefetches the
+        input datasets into a bounded buffer, a pool of workers (see set_executor)
+        calculates the new datasets, and the results are written using a
+        single handle to the DADF5 file opened for modification.
+        Time spent and data volume processed in each stage are reported
+        in 'pipeline_statistics'.
+
+        Parameters
+        ----------
+        operations : list of (function, dictionary, dictionary)
+            Callback function, datasets, and arguments (see _add_generic_pointwise).
+        pool : concurrent.futures.Executor, optional
+            Running pool of workers shared with other files (see ResultSet).
+            At most two jobs per file are then in flight.
+            Defaults to None, i.e. a new pool is created.
+
+        """
+        if self._comm is not None:
+            return self._process_MPI(operations)
+
+        jobs,N_rows = [],{}
+        for group in self.groups_with_datasets(True):
+            available = self._index_datasets(*group.split('/'))
+            if any(set(o[1].values()) <= available.keys() for o in operations):
+                labels = [l for l in set(l for o in operations for l in o[1].values()) if l in available]
+                if self._chunk_size is None:
+                    jobs.append((group,slice(None),labels))
+                else:
+                    N_rows[group] = available[labels[0]]['shape'][0]
+                    jobs += [(group,slice(s,min(s+self._chunk_size,N_rows[group])),labels)
+                             for s in range(0,N_rows[group],self._chunk_size)]
+        if len(jobs) == 0:
+            print('No matching dataset found, no data was added.')
+            return
+
+        self.pipeline_statistics = {stage:{'time/s':0.0,'size/MB':0.0,'throughput/(MB/s)':0.0}
+                                    for stage in ['read','compute','write']}
+
+        N_workers = util._num_workers()
+        buffer  = queue.Queue(maxsize=N_workers)                                                    # prefetched input
+        results = queue.Queue()                                                                     # calculated output
+
+        def collect(future):
+            if future.exception() is not None:                                                      # e.g. pickling failed, worker died
+                print(f'Error during calculation: {future.exception()}.')
+            results.put(None if future.exception() else future.result())
+
+        written = set()
+        skipped = set(range(len(operations)))                                                       # input missing in all groups
+        N_in_flight = 2*N_workers if pool is None else 2
+        with util._executor(self._executor,N_workers) if pool is None else nullcontext(pool) as pool:
+            if self._executor == 'process':
+                with self._lock:                                                                    # forked workers must not inherit a file handle
+                    session = self._handle is not None
+                    self.close()
+                    util._start_workers(pool,N_workers)                                             # fork workers before opening the file
+                    if session: self.open()
+            with self._file('a') as f:                                                              # shared with views, writes are exclusive
+                stop = threading.Event()
+                reader = threading.Thread(target=self._read_groups,args=(f,jobs,buffer,stop),daemon=True)
+                reader.start()
+                exhausted,in_flight = False,0
                 try:
-                    if self._allow_modification and result[0]+'/'+result[1]['label'] in f:
-                        dataset = f[result[0]+'/'+result[1]['label']]
-                        dataset[...] = result[1]['data']
-                        dataset.attrs['Overwritten'] = 'Yes' if h5py3 else \
-                                                       'Yes'.encode()
-                    else:
-                        dataset = f[result[0]].create_dataset(result[1]['label'],data=result[1]['data'])
+                    for _ in util.show_progress(range(len(jobs))):
+                        while not exhausted and in_flight < N_in_flight:
+                            job = buffer.get()
+                            if job is None:
+                                exhausted = True
+                            elif isinstance(job,Exception):
+                                raise job
+                            else:
+                                pool.submit(Result._job,*job,operations).add_done_callback(collect)
+                                in_flight += 1
+                        result = results.get()
+                        in_flight -= 1
+                        if not result:
+                            skipped.clear()                                                         # error already reported
+                            continue
+                        self._tally('compute',result[2],sum(np.asarray(r['data']).nbytes for r in result[1]))
+                        group,rows = result[0]
+                        for r in result[1]:
+                            self._write_dataset(f,group,r,rows,N_rows.get(group),written)
+                        skipped &= set(result[3])
+                finally:
+                    stop.set()
+                    while reader.is_alive():                                                        # unblock reader on error
+                        try:
+                            buffer.get(timeout=.1)
+                        except queue.Empty:
+                            pass
+                    reader.join()
+
+        for _ in skipped:
+            print('No matching dataset found, no data was added.')
+
+
+    def _process_MPI(self,operations):
+        """
+        Calculate and store new pointwise datasets distributed over MPI ranks.
+
+        Each rank calculates its slab of rows (see set_communicator). The shape,
+        data type, and metadata of the new datasets are exchanged to create them
+        collectively, also on ranks without rows. A dataset whose calculation
+        failed on any rank with rows is not written on any rank.
 
-                    now = datetime.datetime.now().astimezone()
-                    dataset.attrs['Created'] = now.strftime('%Y-%m-%d %H:%M:%S%z') if h5py3 else \
-                                               now.strftime('%Y-%m-%d %H:%M:%S%z').encode()
+        Parameters
+        ----------
+        operations : list of (function, dictionary, dictionary)
+            Callback function, datasets, and arguments (see _add_generic_pointwise).
+
+        """
+        self.pipeline_statistics = {stage:{'time/s':0.0,'size/MB':0.0,'throughput/(MB/s)':0.0}
+                                    for stage in ['read','compute','write']}
+        found = False
+        skipped = set(range(len(operations)))                                                       # input missing in all groups
+        with self._lock, self._file('a') as f:
+            for group in util.show_progress(self.groups_with_datasets(True)):
+                available = self._index_datasets(*group.split('/'))
+                if not any(set(o[1].values()) <= available.keys() for o in operations): continue
+                found = True
+                labels = [l for l in set(l for o in operations for l in o[1].values()) if l in available]
+                N_rows = available[labels[0]]['shape'][0]
+                rows = self._slab(N_rows)
+
+                start = time.perf_counter()
+                datasets_in = {}
+                for label in labels:
+                    path = group+'/'+label
+                    with f[path].collective if self._collective(N_rows) else nullcontext():
+                        datasets_in[label] = {'data':f[path][rows],
+                                              'label':label,
+                                              'meta':self._index_lookup(path)['attrs']}
+                self._tally('read',time.perf_counter()-start,sum(d['data'].nbytes for d in datasets_in.values()))
+
+                _,results,duration,pending = Result._job(group,datasets_in,operations)
+                skipped &= set(pending)
+                self._tally('compute',duration,sum(np.asarray(r['data']).nbytes for r in results))
+
+                calculated = {r['label']:np.asarray(r['data']) for r in results}
+                gathered = self._comm.allgather(({r['label']:(calculated[r['label']].shape[1:],
+                                                              calculated[r['label']].dtype.str,r['meta'])
+                                                  for r in results},rows.stop > rows.start))
+                described = {}
+                for descriptions,_ in gathered: described.update(descriptions)                      # same order on all ranks
+                for label,(shape,dtype,meta) in described.items():
+                    if any(has_rows and label not in descriptions for descriptions,has_rows in gathered):
+                        print(f'Could not add dataset "{label}": calculation failed on at least one rank.')
+                        continue
+                    data = calculated.get(label,np.empty((0,)+shape,dtype))
+                    self._write_dataset(f,group,{'data':data,'label':label,'meta':meta},rows,N_rows,set(),
+                                        chunk_rows=-(-N_rows//self._comm.Get_size()))
+        if not found:
+            print('No matching dataset found, no data was added.')
+        else:
+            for _ in skipped:
+                print('No matching dataset found, no data was added.')
+
+
+    def export_columnar(self,labels,format='npz',component=0):
+        """
+        Export to columnar binary files, one per increment.
+
+        Each file contains the cell coordinates ('pos') and the datasets
+        distributed onto the cells (see place). The shapes are stored alongside,
+        i.e. the files can be read with Table.load_npz, Table.load_parquet,
+        or Table.load_feather. Only one increment is kept in memory at a time.
+
+        Parameters
+        ----------
+        labels : str or list of str
+            Labels of the datasets to be exported.
+        format : str, optional
+            File format, 'npz' (default), 'parquet', or 'feather'.
+            'parquet' and 'feather' require pyarrow.
+        component : int, optional
+            Homogenization component to consider for constituent data. Defaults to 0.
 
-                    for l,v in result[1]['meta'].items():
-                        dataset.attrs[l]=v if h5py3 else v.encode()
-                    creator = dataset.attrs['Creator'] if h5py3 else \
-                              dataset.attrs['Creator'].decode()
-                    dataset.attrs['Creator'] = f"damask.Result.{creator} v{damask.version}" if h5py3 else \
-                                               f"damask.Result.{creator} v{damask.version}".encode()
+        """
+        if format not in ['npz','parquet','feather']:
+            raise ValueError(f'Unknown format "{format}"')
 
-                except (OSError,RuntimeError) as err:
-                    print(f'Could not add dataset: {err}.')
-            lock.release()
+        N_digits = int(np.floor(np.log10(max(1,int(self.increments[-1][3:])))))+1
+        pos = Table(self.cell_coordinates,{'pos':(3,)})
 
-        pool.close()
-        pool.join()
+        for inc in util.show_progress(self.selection['increments']):
+            tbl = self.view(increments=inc).place(labels,component).get(inc)
+            if tbl is None: continue
+            getattr(pos.join(tbl),f'save_{format}')(f'{self.fname.stem}_inc{inc[3:].zfill(N_digits)}.{format}')
 
 
     def save_XDMF(self):
@@ -1153,6 +3368,11 @@ class Result:
         attributes = []
         data_items = []
 
+        derived = set()
+        if self.sidecar is not None:
+            with h5py.File(self.sidecar,'r') as f:
+                f.visit(derived.add)
+
         for inc in self.increments:
 
             grid=ET.SubElement(collection,'Grid')
@@ -1179,48 +3399,52 @@ class Result:
             delta.text="{} {} {}".format(*(self.size/self.grid))
 
 
-            with h5py.File(self.fname,'r') as f:
-                attributes.append(ET.SubElement(grid, 'Attribute'))
-                attributes[-1].attrib={'Name':          'u',
-                                       'Center':        'Node',
-                                       'AttributeType': 'Vector'}
-                data_items.append(ET.SubElement(attributes[-1], 'DataItem'))
-                data_items[-1].attrib={'Format':     'HDF',
-                                       'Precision':  '8',
-                                       'Dimensions': '{} {} {} 3'.format(*(self.grid+1))}
-                data_items[-1].text=f'{os.path.split(self.fname)[1]}:/{inc}/geometry/u_n'
-
-                for o,p in zip(['constituents','materialpoints'],['con_physics','mat_physics']):
-                    for oo in getattr(self,o):
-                        for pp in getattr(self,p):
-                            g = '/'.join([inc,o[:-1],oo,pp])
-                            for l in f[g]:
-                                name = '/'.join([g,l])
-                                shape = f[name].shape[1:]
-                                dtype = f[name].dtype
-                                prec  = f[name].dtype.itemsize
-
-                                if (shape not in [(1,), (3,), (3,3)]) or dtype != np.float64: continue
-
-                                attributes.append(ET.SubElement(grid, 'Attribute'))
-                                attributes[-1].attrib={'Name':          name.split('/',2)[2],
-                                                       'Center':        'Cell',
-                                                       'AttributeType': 'Tensor'}
-                                data_items.append(ET.SubElement(attributes[-1], 'DataItem'))
-                                data_items[-1].attrib={'Format':     'HDF',
-                                                       'NumberType': 'Float',
-                                                       'Precision':  f'{prec}',
-                                                       'Dimensions': '{} {} {} {}'.format(*self.grid,np.prod(shape))}
-                                data_items[-1].text=f'{os.path.split(self.fname)[1]}:{name}'
+            attributes.append(ET.SubElement(grid, 'Attribute'))
+            attributes[-1].attrib={'Name':          'u',
+                                   'Center':        'Node',
+                                   'AttributeType': 'Vector'}
+            data_items.append(ET.SubElement(attributes[-1], 'DataItem'))
+            data_items[-1].attrib={'Format':     'HDF',
+                                   'Precision':  '8',
+                                   'Dimensions': '{} {} {} 3'.format(*(self.grid+1))}
+            data_items[-1].text=f'{os.path.split(self.fname)[1]}:/{inc}/geometry/u_n'
+
+            for o,p in zip(['constituents','materialpoints'],['con_physics','mat_physics']):
+                for oo in getattr(self,o):
+                    for pp in getattr(self,p):
+                        g = '/'.join([inc,o[:-1],oo,pp])
+                        for l,info in self._index_datasets(inc,o[:-1],oo,pp).items():
+                            name = '/'.join([g,l])
+                            shape = info['shape'][1:]
+                            dtype = info['dtype']
+                            prec  = info['dtype'].itemsize
+
+                            if (shape not in [(1,), (3,), (3,3)]) or dtype != np.float64: continue
+
+                            attributes.append(ET.SubElement(grid, 'Attribute'))
+                            attributes[-1].attrib={'Name':          name.split('/',2)[2],
+                                                   'Center':        'Cell',
+                                                   'AttributeType': 'Tensor'}
+                            data_items.append(ET.SubElement(attributes[-1], 'DataItem'))
+                            data_items[-1].attrib={'Format':     'HDF',
+                                                   'NumberType': 'Float',
+                                                   'Precision':  f'{prec}',
+                                                   'Dimensions': '{} {} {} {}'.format(*self.grid,np.prod(shape))}
+                            data_items[-1].text=f'{(self.sidecar if name in derived else self.fname).name}:{name}'
 
         with open(self.fname.with_suffix('.xdmf').name,'w') as f:
             f.write(xml.dom.minidom.parseString(ET.tostring(xdmf).decode()).toprettyxml())
 
 
-    def save_vtk(self,labels=[],mode='cell'):
+    def save_vtk(self,labels=[],mode='cell',memory_limit=2**30):
         """
         Export to vtk cell/point data.
 
+        The locations of all datasets are resolved once. Then, a reader
+        thread prefetches the data of the following increments while
+        a bounded pool of background processes or threads (see set_executor)
+        writes the VTK files.
+
         Parameters
         ----------
         labels : str or list of, optional
@@ -1228,6 +3452,9 @@ class Result:
         mode : str, either 'cell' or 'point'
             Export in cell format or point format.
             Defaults to 'cell'.
+        memory_limit : int, optional
+            Approximate upper limit in bytes for prefetched data.
+            Defaults to 2**30, but at least one increment is prefetched.
 
         """
         if mode.lower()=='cell':
@@ -1235,7 +3462,7 @@ class Result:
             if self.structured:
                 v = VTK.from_rectilinear_grid(self.grid,self.size,self.origin)
             else:
-                with h5py.File(self.fname,'r') as f:
+                with self._file() as f:
                     v = VTK.from_unstructured_grid(f['/geometry/x_n'][()],
                                                    f['/geometry/T_c'][()]-1,
                                                    f['/geometry/T_c'].attrs['VTK_TYPE'].decode())
@@ -1244,49 +3471,66 @@ class Result:
 
         N_digits = int(np.floor(np.log10(max(1,int(self.increments[-1][3:])))))+1
 
-        for inc in util.show_progress(self.iterate('increments'),len(self.selection['increments'])):
-
-            materialpoints_backup = self.selection['materialpoints'].copy()
-            self.pick('materialpoints',False)
-            for label in (labels if isinstance(labels,list) else [labels]):
-                for p in self.iterate('con_physics'):
-                    if p != 'generic':
-                        for c in self.iterate('constituents'):
-                            x = self.get_dataset_location(label)
-                            if len(x) == 0:
-                                continue
-                            array = self.read_dataset(x,0)
-                            v.add(array,'1_'+x[0].split('/',1)[1]) #ToDo: hard coded 1!
-                    else:
-                        x = self.get_dataset_location(label)
-                        if len(x) == 0:
-                            continue
-                        array = self.read_dataset(x,0)
-                        ph_name = re.compile(r'(?<=(constituent\/))(.*?)(?=(generic))')             # identify  phase name
-                        dset_name = '1_' + re.sub(ph_name,r'',x[0].split('/',1)[1])                 # removing phase name
-                        v.add(array,dset_name)
-            self.pick('materialpoints',materialpoints_backup)
-
-            constituents_backup = self.selection['constituents'].copy()
-            self.pick('constituents',False)
+        u = 'u_n' if mode.lower() == 'cell' else 'u_p'
+        plan = {inc:[] for inc in self.selection['increments']}
+        for inc in self.selection['increments']:
             for label in (labels if isinstance(labels,list) else [labels]):
-                for p in self.iterate('mat_physics'):
-                    if p != 'generic':
-                        for m in self.iterate('materialpoints'):
-                            x = self.get_dataset_location(label)
-                            if len(x) == 0:
-                                continue
-                            array = self.read_dataset(x,0)
-                            v.add(array,'1_'+x[0].split('/',1)[1]) #ToDo: why 1_?
-                    else:
-                        x = self.get_dataset_location(label)
-                        if len(x) == 0:
-                            continue
-                        array = self.read_dataset(x,0)
-                        v.add(array,'1_'+x[0].split('/',1)[1])
-            self.pick('constituents',constituents_backup)
+                for o,p in zip(['constituent','materialpoint'],['con_physics','mat_physics']):
+                    for pp in self.selection[p]:
+                        paths = ['/'.join([inc,o,oo,pp,label]) for oo in self.selection[o+'s']
+                                 if label in self._index_datasets(inc,o,oo,pp)]
+                        if pp == 'generic' and o == 'constituent':                                  # merge phases, remove phase name
+                            if paths: plan[inc].append(('1_'+'/'.join([o,pp,label]),paths))
+                        else:
+                            plan[inc] += [('1_'+path.split('/',1)[1],[path]) for path in paths]
+            if u in self._index[inc]['geometry']:
+                plan[inc].append(('u',['/'.join([inc,'geometry',u])]))
+
+        size = max([sum(np.prod(self._index_lookup(paths[0])['shape'][1:],dtype=int)*self._index_lookup(paths[0])['dtype'].itemsize
+                        for _,paths in plan[inc])*self.Nmaterialpoints for inc in plan]+[1])
+        buffer = queue.Queue(maxsize=max(1,memory_limit//size))
+
+        stop = threading.Event()
+        def read():
+            try:
+                for inc in plan:
+                    if stop.is_set(): return
+                    buffer.put((inc,[(name,self.read_dataset(paths,0)) for name,paths in plan[inc]]))
+            except Exception as err:
+                buffer.put(err)
 
-            u = self.read_dataset(self.get_dataset_location('u_n' if mode.lower() == 'cell' else 'u_p'))
-            v.add(u,'u')
+        reader = threading.Thread(target=read)
+        reader.start()
 
-            v.save(f'{self.fname.stem}_inc{inc[3:].zfill(N_digits)}')
+        N_writers = util._num_workers()
+        writers = []
+        try:
+            for _ in util.show_progress(range(len(plan))):
+                job = buffer.get()
+                if isinstance(job,Exception): raise job
+                inc,arrays = job
+                for name,array in arrays:
+                    v.add(array,name)
+                fname = f'{self.fname.stem}_inc{inc[3:].zfill(N_digits)}'
+                if self._executor == 'serial':
+                    v.save(fname,False)
+                    continue
+                while len(writers) >= N_writers:
+                    writers.pop(0).join()
+                if self._executor == 'process':
+                    writers.append(mp.Process(target=v.save,args=(fname,False)))
+                else:
+                    snapshot = v.vtk_data.NewInstance()                                             # v is modified for next increment
+                    snapshot.DeepCopy(v.vtk_data)
+                    writers.append(threading.Thread(target=VTK(snapshot).save,args=(fname,False)))
+                writers[-1].start()
+        finally:
+            stop.set()
+            while reader.is_alive():                                                                # unblock reader on error
+                try:
+                    buffer.get(timeout=.1)
+                except queue.Empty:
+                    pass
+            reader.join()
+            for w in writers:
+                w.join()
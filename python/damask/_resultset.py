@@ -0,0 +1,175 @@
+import glob
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import Result
+from . import Table
+from . import util
+
+class ResultSet:
+    """
+    Ensemble of DADF5 files, e.g. from a parameter study.
+
+    add_* calls are forwarded to all files and processed
+    by a single pool of workers.
+    """
+
+    def __init__(self,fnames):
+        """
+        Open existing DADF5 files.
+
+        Parameters
+        ----------
+        fnames : str or list of str or pathlib.Path
+            Names of the DADF5 files or glob pattern, e.g. 'study/*.hdf5'.
+
+        """
+        self.fnames  = sorted(glob.glob(fnames)) if isinstance(fnames,str) else list(fnames)
+        self.results = [Result(fname) for fname in self.fnames]
+        self._deferred = False
+        self._executor = 'process'
+
+
+    def __repr__(self):
+        """Show names of the files."""
+        return util.srepr([f'{i}: {fname}' for i,fname in enumerate(self.fnames)])
+
+
+    def __len__(self):
+        """Number of files."""
+        return len(self.results)
+
+
+    def __iter__(self):
+        """Iterate over results."""
+        return iter(self.results)
+
+
+    def __getitem__(self,item):
+        """Result of a file."""
+        return self.results[item]
+
+
+    def __getattr__(self,name):
+        """Forward add_* calls to all files."""
+        if not (name.startswith('add_') and hasattr(Result,name)):
+            raise AttributeError(f"'ResultSet' object has no attribute '{name}'")
+
+        def add(*args,**kwargs):
+            for r in self.results:
+                if r._deferred is None: r.defer()
+                getattr(r,name)(*args,**kwargs)
+            if not self._deferred: self.compute()
+        return add
+
+
+    def pick(self,what,datasets):
+        """
+        Set selection of all files (see Result.pick).
+
+        Parameters
+        ----------
+        what : str
+            attribute to change (must be from self.selection)
+        datasets : list of str or bool
+            name of datasets as list, supports ? and * wildcards.
+            True is equivalent to [*], False is equivalent to []
+
+        """
+        for r in self.results:
+            r.pick(what,datasets)
+
+
+    def set_executor(self,executor='process'):
+        """
+        Set the parallelization of add_* operations (see Result.set_executor).
+
+        Parameters
+        ----------
+        executor : {'process', 'thread', 'serial'}, optional
+            Type of the shared pool of workers. Defaults to 'process'.
+
+        """
+        for r in self.results:
+            r.set_executor(executor)
+        self._executor = executor
+
+
+    def defer(self):
+        """Defer the calculation of new datasets until 'compute' is called (see Result.defer)."""
+        self._deferred = True
+
+
+    def compute(self):
+        """
+        Evaluate all deferred add_* calls of all files.
+
+        The jobs (groups of datasets) of all files are processed by a single
+        pool of workers. Files are handled concurrently, starting with
+        the largest ones to balance the load.
+        """
+        self._deferred = False
+        operations = {id(r):r._deferred for r in self.results}
+        for r in self.results: r._deferred = None
+        todo = sorted([r for r in self.results if operations[id(r)]],key=self._size,reverse=True)
+        if not todo: return
+
+        N_workers = util._num_workers()
+        with util._executor(self._executor,N_workers) as pool:
+            util._start_workers(pool,N_workers)                                                     # fork workers before opening files
+            with util._executor('thread',min(N_workers,len(todo))) as files:
+                list(files.map(lambda r: r._process(operations[id(r)],pool),todo))
+
+
+    @staticmethod
+    def _size(r):
+        """Size in bytes of the selected datasets of a file."""
+        return sum(int(np.prod(info['shape']))*info['dtype'].itemsize
+                   for group in r.groups_with_datasets(True)
+                   for info in r._index_datasets(*group.split('/')).values())
+
+
+    def reduce(self,labels,ops=['mean']):
+        """
+        Statistics per file and increment, e.g. the volume-averaged stress-strain curve.
+
+        Parameters
+        ----------
+        labels : str or list of str
+            Labels of the datasets.
+        ops : list of str, optional
+            Statistics to calculate (see Result.reduce). Histograms are not supported.
+            Defaults to ['mean'].
+
+        Returns
+        -------
+        statistics : damask.Table
+            Columns 'run' (index of the file, see fnames), 'increment', 'time',
+            and '<op>(<label>)' for each label and statistic.
+
+        """
+        labels_ = [labels] if isinstance(labels,str) else labels
+
+        def reduce(r):
+            return {label:r.reduce(label,ops) for label in labels_}
+
+        with util._executor('thread') as executor:
+            statistics = list(executor.map(reduce,self.results))
+
+        columns,shapes = {'run':[],'increment':[],'time':[]},{'run':(1,),'increment':(1,),'time':(1,)}
+        for i,(r,s) in enumerate(zip(self.results,statistics)):
+            for inc in r.selection['increments']:
+                if not all(inc in s[label] for label in labels_): continue
+                columns['run'].append(np.array([i]))
+                columns['increment'].append(np.array([int(inc[3:])]))
+                columns['time'].append(np.array([r.times[r.increments.index(inc)]]))
+                for label in labels_:
+                    for op in ops:
+                        x = np.asarray(s[label][inc][op],dtype=float)
+                        columns.setdefault(f'{op}({label})',[]).append(x.reshape(-1))
+                        shapes[f'{op}({label})'] = x.shape if x.shape else (1,)
+
+        data = pd.concat([pd.DataFrame(np.array(c).reshape(len(c),-1)) for c in columns.values()],axis=1)
+        return Table(data,shapes,[f'run {i}: {Path(fname).absolute()}' for i,fname in enumerate(self.fnames)])
@@ -1,5 +1,6 @@
 import re
 import copy
+import json
 
 import pandas as pd
 import numpy as np
@@ -111,6 +112,14 @@ class Table:
                 line = f.readline().strip()
             labels = line.split()
 
+        data = pd.read_csv(f,names=list(range(len(labels))),sep=r'\s+')
+
+        return Table(data,Table._shapes_from_labels(labels),comments)
+
+
+    @staticmethod
+    def _shapes_from_labels(labels):
+        """Shapes of the columns from individual column labels, e.g. 3x3:1_T ... 3x3:9_T ==> T:(3,3)."""
         shapes = {}
         for label in labels:
             tensor_column = re.search(r'[0-9,x]*?:[0-9]*?_',label)
@@ -123,11 +132,70 @@ class Table:
                     shapes[label.split('_',1)[1]] = (int(label.split('_',1)[0]),)
                 else:
                     shapes[label] = (1,)
+        return shapes
 
-        data = pd.read_csv(f,names=list(range(len(labels))),sep=r'\s+')
+
+    @staticmethod
+    def load_npz(fname):
+        """
+        Load NumPy .npz file (see save_npz).
+
+        Parameters
+        ----------
+        fname : file, str, or pathlib.Path
+            Filename or file for reading.
+
+        """
+        with np.load(fname,allow_pickle=False) as f:
+            comments = list(f['__comments__']) if '__comments__' in f.files else []
+            columns = {label:f[label] for label in f.files if label != '__comments__'}
+        shapes = {label:c.shape[1:] if c.ndim > 1 else (1,) for label,c in columns.items()}
+        data = pd.concat([pd.DataFrame(c.reshape(len(c),-1)) for c in columns.values()],axis=1)
 
         return Table(data,shapes,comments)
 
+
+    @staticmethod
+    def _load_arrow(table):
+        """Table from pyarrow.Table with column labels as used by save and comments as metadata."""
+        metadata = table.schema.metadata or {}
+        comments = json.loads(metadata[b'comments']) if b'comments' in metadata else []
+        return Table(table.to_pandas(),Table._shapes_from_labels(table.column_names),comments)
+
+
+    @staticmethod
+    def load_parquet(fname):
+        """
+        Load Apache Parquet file (see save_parquet).
+
+        Requires pyarrow.
+
+        Parameters
+        ----------
+        fname : file, str, or pathlib.Path
+            Filename or file for reading.
+
+        """
+        from pyarrow import parquet
+        return Table._load_arrow(parquet.read_table(fname))
+
+
+    @staticmethod
+    def load_feather(fname):
+        """
+        Load Feather (Apache Arrow IPC) file (see save_feather).
+
+        Requires pyarrow.
+
+        Parameters
+        ----------
+        fname : file, str, or pathlib.Path
+            Filename or file for reading.
+
+        """
+        from pyarrow import feather
+        return Table._load_arrow(feather.read_table(fname))
+
     @staticmethod
     def load_ang(fname):
         """
@@ -348,6 +416,22 @@ class Table:
             return dup
 
 
+    def _header_labels(self):
+        """Individual column labels encoding the shapes, e.g. T:(3,3) ==> 3x3:1_T ... 3x3:9_T."""
+        seen = set()
+        labels = []
+        for l in [x for x in self.data.columns if not (x in seen or seen.add(x))]:
+            if self.shapes[l] == (1,):
+                labels.append(f'{l}')
+            elif len(self.shapes[l]) == 1:
+                labels += [f'{i+1}_{l}' \
+                          for i in range(self.shapes[l][0])]
+            else:
+                labels += [f'{util.srepr(self.shapes[l],"x")}:{i+1}_{l}' \
+                          for i in range(np.prod(self.shapes[l]))]
+        return labels
+
+
     def save(self,fname,legacy=False):
         """
         Save as plain text file.
@@ -361,17 +445,7 @@ class Table:
             in contrast to using comment sign ('#') at beginning of lines.
 
         """
-        seen = set()
-        labels = []
-        for l in [x for x in self.data.columns if not (x in seen or seen.add(x))]:
-            if self.shapes[l] == (1,):
-                labels.append(f'{l}')
-            elif len(self.shapes[l]) == 1:
-                labels += [f'{i+1}_{l}' \
-                          for i in range(self.shapes[l][0])]
-            else:
-                labels += [f'{util.srepr(self.shapes[l],"x")}:{i+1}_{l}' \
-                          for i in range(np.prod(self.shapes[l]))]
+        labels = self._header_labels()
 
         header = ([f'{len(self.comments)+1} header'] + self.comments) if legacy else \
                   [f'# {comment}' for comment in self.comments]
@@ -383,3 +457,66 @@ class Table:
 
         for line in header + [' '.join(labels)]: fhandle.write(line+'\n')
         self.data.to_csv(fhandle,sep=' ',na_rep='nan',index=False,header=False)
+
+
+    def save_npz(self,fname,compress=False):
+        """
+        Save as NumPy .npz file with one array of native shape per column.
+
+        Parameters
+        ----------
+        fname : file, str, or pathlib.Path
+            Filename or file for writing.
+        compress : Boolean, optional
+            Compress the arrays. Defaults to False.
+
+        """
+        columns = {label:self.data[label].to_numpy().reshape((-1,)+self.shapes[label]) for label in self.shapes}
+        (np.savez_compressed if compress else np.savez)(fname,__comments__=np.array(self.comments,dtype=str),
+                                                        **columns)
+
+
+    def _to_arrow(self):
+        """pyarrow.Table with column labels as used by save and comments as metadata."""
+        import pyarrow
+        data = self.data.copy(deep=False)
+        data.columns = self._header_labels()
+        table = pyarrow.Table.from_pandas(data,preserve_index=False)
+        return table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                              b'comments':json.dumps(self.comments).encode()})
+
+
+    def save_parquet(self,fname,compression='snappy'):
+        """
+        Save as Apache Parquet file.
+
+        Requires pyarrow.
+
+        Parameters
+        ----------
+        fname : file, str, or pathlib.Path
+            Filename or file for writing.
+        compression : str, optional
+            Compression codec. Defaults to 'snappy'.
+
+        """
+        from pyarrow import parquet
+        parquet.write_table(self._to_arrow(),fname,compression=compression)
+
+
+    def save_feather(self,fname,compression=None):
+        """
+        Save as Feather (Apache Arrow IPC) file.
+
+        Requires pyarrow.
+
+        Parameters
+        ----------
+        fname : file, str, or pathlib.Path
+            Filename or file for writing.
+        compression : str, optional
+            Compression codec, 'lz4' or 'zstd'. Defaults to None.
+
+        """
+        from pyarrow import feather
+        feather.write_feather(self._to_arrow(),fname,compression=compression or 'uncompressed')
@@ -316,6 +316,24 @@ class Test:
     return self.compare_Array(refName,curName)
 
 
+  def compare_Result(self,File1,File2,rtol=1e-5,atol=1e-8,labels=None):
+
+    logging.info('\n '.join(['comparing',File1,File2]))
+    report = damask.Result(File1).compare(File2,rtol=rtol,atol=atol,labels=labels)
+    for path,entry in report.items():
+      if not entry['equal']:
+        logging.info(f'{path}: {entry["message"]} (max. abs. error {entry["max abs error"]}, max. rel. error {entry["max rel error"]})')
+    return all(entry['equal'] for entry in report.values())
+
+
+  def compare_ResultRefCur(self,ref,cur='',rtol=1e-5,atol=1e-8,labels=None):
+
+    if cur == '': cur = ref
+    refName = self.fileInReference(ref)
+    curName = self.fileInCurrent(cur)
+    return self.compare_Result(curName,refName,rtol,atol,labels)
+
+
   def compare_Table(self,headings0,file0,
                          headings1,file1,
                          normHeadings='',normType=None,
@@ -1,4 +1,5 @@
 import multiprocessing as mp
+import threading
 from pathlib import Path
 
 import pandas as pd
@@ -184,8 +185,10 @@ class VTK:
         ----------
         fname : str or pathlib.Path
             Filename for writing.
-        parallel : boolean, optional
-            Write data in parallel background process. Defaults to True.
+        parallel : bool or {'process', 'thread'}, optional
+            Write data in parallel background process (True or 'process') or
+            thread ('thread'). The data must not be modified while a background
+            thread writes it. Defaults to True.
         compress : bool, optional
             Compress with zlib algorithm. Defaults to True.
 
@@ -208,12 +211,14 @@ class VTK:
         writer.SetDataModeToBinary()
         writer.SetInputData(self.vtk_data)
 
-        if parallel:
+        if parallel in [True,'process']:
             try:
                 mp_writer = mp.Process(target=self._write,args=(writer,))
                 mp_writer.start()
             except TypeError:
                 writer.Write()
+        elif parallel == 'thread':
+            threading.Thread(target=self._write,args=(writer,)).start()
         else:
             writer.Write()
 
@@ -11,10 +11,20 @@ the following operations are required for tensorial data:
 D3 = D1.reshape(grid+(-1,),order='F').reshape(grid+(3,3))
 D1 = D3.reshape(grid+(-1,)).reshape(-1,9,order='F')
 
+The wave numbers of the most recently used grids are cached
+(see clear_cache). The Fourier transforms use scipy.fft, which
+keeps its own cache of FFT plans. They are multithreaded if
+'workers' is given or DAMASK_NUM_THREADS is set.
+
 """
+from functools import lru_cache as _lru_cache
+
 from scipy import spatial as _spatial
+from scipy import fft as _fft
 import numpy as _np
 
+from . import util as _util
+
 def _ks(size,grid,first_order=False):
     """
     Get wave numbers operator.
@@ -28,7 +38,18 @@ def _ks(size,grid,first_order=False):
     first_order : bool, optional
         correction for first order derivatives, defaults to False.
 
+    Returns
+    -------
+    k_s : numpy.ndarray of shape (:,:,:,3)
+        wave numbers, read-only view of the cached array.
+
     """
+    return _ks_cached(tuple(float(s) for s in size),tuple(int(g) for g in grid),bool(first_order))
+
+
+@_lru_cache(maxsize=4)
+def _ks_cached(size,grid,first_order):
+    """Get wave numbers operator for hashable arguments (see _ks)."""
     k_sk = _np.where(_np.arange(grid[0])>grid[0]//2,_np.arange(grid[0])-grid[0],_np.arange(grid[0]))/size[0]
     if grid[0]%2 == 0 and first_order: k_sk[grid[0]//2] = 0                                         # Nyquist freq=0 for even grid (Johnson, MIT, 2011)
 
@@ -37,10 +58,22 @@ def _ks(size,grid,first_order=False):
 
     k_si = _np.arange(grid[2]//2+1)/size[2]
 
-    return _np.stack(_np.meshgrid(k_sk,k_sj,k_si,indexing = 'ij'), axis=-1)
+    k_s = _np.stack(_np.meshgrid(k_sk,k_sj,k_si,indexing = 'ij'), axis=-1)
+    k_s.setflags(write=False)
+    return k_s
+
 
+def clear_cache():
+    """Clear the cached wave numbers to free memory."""
+    _ks_cached.cache_clear()
 
-def curl(size,field):
+
+def _workers(workers=None):
+    """Number of threads for the Fourier transforms, defaults to DAMASK_NUM_THREADS or 1."""
+    return _util._num_workers(workers,1)
+
+
+def curl(size,field,workers=None):
     """
     Calculate curl of a vector or tensor field in Fourier space.
 
@@ -50,23 +83,42 @@ def curl(size,field):
         physical size of the periodic field.
     field : numpy.ndarray of shape (:,:,:,3) or (:,:,:,3,3)
         periodic field of which the curl is calculated.
+    workers : int, optional
+        number of threads for the Fourier transforms.
+        Defaults to DAMASK_NUM_THREADS or, if not set, 1.
+
+    """
+    return _curl(_ks(size,field.shape[:3],True),field,_workers(workers))
+
+
+def _curl(k_s,field,workers=1):
+    """
+    Calculate curl of a vector or tensor field for given wave numbers.
+
+    Parameters
+    ----------
+    k_s : numpy.ndarray of shape (:,:,:,3)
+        wave numbers for first order derivatives (see _ks).
+    field : numpy.ndarray of shape (:,:,:,3) or (:,:,:,3,3)
+        periodic field of which the curl is calculated.
+    workers : int, optional
+        number of threads for the Fourier transforms. Defaults to 1.
 
     """
     n = _np.prod(field.shape[3:])
-    k_s = _ks(size,field.shape[:3],True)
 
     e = _np.zeros((3, 3, 3))
     e[0, 1, 2] = e[1, 2, 0] = e[2, 0, 1] = +1.0                                                     # Levi-Civita symbol
     e[0, 2, 1] = e[2, 1, 0] = e[1, 0, 2] = -1.0
 
-    field_fourier = _np.fft.rfftn(field,axes=(0,1,2))
+    field_fourier = _fft.rfftn(field,axes=(0,1,2),workers=workers)
     curl_ = (_np.einsum('slm,ijkl,ijkm ->ijks', e,k_s,field_fourier)*2.0j*_np.pi if n == 3 else     # vector, 3   -> 3
              _np.einsum('slm,ijkl,ijknm->ijksn',e,k_s,field_fourier)*2.0j*_np.pi)                   # tensor, 3x3 -> 3x3
 
-    return _np.fft.irfftn(curl_,axes=(0,1,2),s=field.shape[:3])
+    return _fft.irfftn(curl_,axes=(0,1,2),s=field.shape[:3],workers=workers,overwrite_x=True)
 
 
-def divergence(size,field):
+def divergence(size,field,workers=None):
     """
     Calculate divergence of a vector or tensor field in Fourier space.
 
@@ -76,19 +128,38 @@ def divergence(size,field):
         physical size of the periodic field.
     field : numpy.ndarray of shape (:,:,:,3) or (:,:,:,3,3)
         periodic field of which the divergence is calculated.
+    workers : int, optional
+        number of threads for the Fourier transforms.
+        Defaults to DAMASK_NUM_THREADS or, if not set, 1.
+
+    """
+    return _divergence(_ks(size,field.shape[:3],True),field,_workers(workers))
+
+
+def _divergence(k_s,field,workers=1):
+    """
+    Calculate divergence of a vector or tensor field for given wave numbers.
+
+    Parameters
+    ----------
+    k_s : numpy.ndarray of shape (:,:,:,3)
+        wave numbers for first order derivatives (see _ks).
+    field : numpy.ndarray of shape (:,:,:,3) or (:,:,:,3,3)
+        periodic field of which the divergence is calculated.
+    workers : int, optional
+        number of threads for the Fourier transforms. Defaults to 1.
 
     """
     n = _np.prod(field.shape[3:])
-    k_s = _ks(size,field.shape[:3],True)
 
-    field_fourier = _np.fft.rfftn(field,axes=(0,1,2))
+    field_fourier = _fft.rfftn(field,axes=(0,1,2),workers=workers)
     div_ = (_np.einsum('ijkl,ijkl ->ijk', k_s,field_fourier)*2.0j*_np.pi if n == 3 else             # vector, 3   -> 1
             _np.einsum('ijkm,ijklm->ijkl',k_s,field_fourier)*2.0j*_np.pi)                           # tensor, 3x3 -> 3
 
-    return _np.fft.irfftn(div_,axes=(0,1,2),s=field.shape[:3])
+    return _fft.irfftn(div_,axes=(0,1,2),s=field.shape[:3],workers=workers,overwrite_x=True)
 
 
-def gradient(size,field):
+def gradient(size,field,workers=None):
     """
     Calculate gradient of a scalar or vector field in Fourier space.
 
@@ -98,16 +169,35 @@ def gradient(size,field):
         physical size of the periodic field.
     field : numpy.ndarray of shape (:,:,:,1) or (:,:,:,3)
         periodic field of which the gradient is calculated.
+    workers : int, optional
+        number of threads for the Fourier transforms.
+        Defaults to DAMASK_NUM_THREADS or, if not set, 1.
+
+    """
+    return _gradient(_ks(size,field.shape[:3],True),field,_workers(workers))
+
+
+def _gradient(k_s,field,workers=1):
+    """
+    Calculate gradient of a scalar or vector field for given wave numbers.
+
+    Parameters
+    ----------
+    k_s : numpy.ndarray of shape (:,:,:,3)
+        wave numbers for first order derivatives (see _ks).
+    field : numpy.ndarray of shape (:,:,:,1) or (:,:,:,3)
+        periodic field of which the gradient is calculated.
+    workers : int, optional
+        number of threads for the Fourier transforms. Defaults to 1.
 
     """
     n = _np.prod(field.shape[3:])
-    k_s = _ks(size,field.shape[:3],True)
 
-    field_fourier = _np.fft.rfftn(field,axes=(0,1,2))
+    field_fourier = _fft.rfftn(field,axes=(0,1,2),workers=workers)
     grad_ = (_np.einsum('ijkl,ijkm->ijkm', field_fourier,k_s)*2.0j*_np.pi if n == 1 else            # scalar, 1 -> 3
              _np.einsum('ijkl,ijkm->ijklm',field_fourier,k_s)*2.0j*_np.pi)                          # vector, 3 -> 3x3
 
-    return _np.fft.irfftn(grad_,axes=(0,1,2),s=field.shape[:3])
+    return _fft.irfftn(grad_,axes=(0,1,2),s=field.shape[:3],workers=workers,overwrite_x=True)
 
 
 def cell_coord0(grid,size,origin=_np.zeros(3)):
@@ -133,7 +223,7 @@ def cell_coord0(grid,size,origin=_np.zeros(3)):
                      axis = -1)
 
 
-def cell_displacement_fluct(size,F):
+def cell_displacement_fluct(size,F,workers=None):
     """
     Cell center displacement field from fluctuation part of the deformation gradient field.
 
@@ -143,21 +233,42 @@ def cell_displacement_fluct(size,F):
         physical size of the periodic field.
     F : numpy.ndarray
         deformation gradient field.
+    workers : int, optional
+        number of threads for the Fourier transforms.
+        Defaults to DAMASK_NUM_THREADS or, if not set, 1.
+
+    """
+    return _cell_displacement_fluct(_ks(size,F.shape[:3],False),size,F,_workers(workers))
+
+
+def _cell_displacement_fluct(k_s,size,F,workers=1):
+    """
+    Cell center displacement field from fluctuation part of the deformation gradient field for given wave numbers.
+
+    Parameters
+    ----------
+    k_s : numpy.ndarray of shape (:,:,:,3)
+        wave numbers (see _ks).
+    size : numpy.ndarray of shape (3)
+        physical size of the periodic field.
+    F : numpy.ndarray
+        deformation gradient field.
+    workers : int, optional
+        number of threads for the Fourier transforms. Defaults to 1.
 
     """
     integrator = 0.5j*size/_np.pi
 
-    k_s = _ks(size,F.shape[:3],False)
     k_s_squared = _np.einsum('...l,...l',k_s,k_s)
     k_s_squared[0,0,0] = 1.0
 
     displacement = -_np.einsum('ijkml,ijkl,l->ijkm',
-                              _np.fft.rfftn(F,axes=(0,1,2)),
+                              _fft.rfftn(F,axes=(0,1,2),workers=workers),
                               k_s,
                               integrator,
                              ) / k_s_squared[...,_np.newaxis]
 
-    return _np.fft.irfftn(displacement,axes=(0,1,2),s=F.shape[:3])
+    return _fft.irfftn(displacement,axes=(0,1,2),s=F.shape[:3],workers=workers,overwrite_x=True)
 
 
 def cell_displacement_avg(size,F):
@@ -176,7 +287,7 @@ def cell_displacement_avg(size,F):
     return _np.einsum('ml,ijkl->ijkm',F_avg - _np.eye(3),cell_coord0(F.shape[:3],size))
 
 
-def cell_displacement(size,F):
+def cell_displacement(size,F,workers=None):
     """
     Cell center displacement field from deformation gradient field.
 
@@ -186,12 +297,15 @@ def cell_displacement(size,F):
         physical size of the periodic field.
     F : numpy.ndarray
         deformation gradient field.
+    workers : int, optional
+        number of threads for the Fourier transforms.
+        Defaults to DAMASK_NUM_THREADS or, if not set, 1.
 
     """
-    return cell_displacement_avg(size,F) + cell_displacement_fluct(size,F)
+    return cell_displacement_avg(size,F) + cell_displacement_fluct(size,F,workers)
 
 
-def cell_coord(size,F,origin=_np.zeros(3)):
+def cell_coord(size,F,origin=_np.zeros(3),workers=None):
     """
     Cell center positions.
 
@@ -203,9 +317,12 @@ def cell_coord(size,F,origin=_np.zeros(3)):
         deformation gradient field.
     origin : numpy.ndarray of shape (3), optional
         physical origin of the periodic field. Defaults to [0.0,0.0,0.0].
+    workers : int, optional
+        number of threads for the Fourier transforms.
+        Defaults to DAMASK_NUM_THREADS or, if not set, 1.
 
     """
-    return cell_coord0(F.shape[:3],size,origin) + cell_displacement(size,F)
+    return cell_coord0(F.shape[:3],size,origin) + cell_displacement(size,F,workers)
 
 
 def cell_coord0_gridSizeOrigin(coord0,ordered=True):
@@ -283,7 +400,7 @@ def node_coord0(grid,size,origin=_np.zeros(3)):
                      axis = -1)
 
 
-def node_displacement_fluct(size,F):
+def node_displacement_fluct(size,F,workers=None):
     """
     Nodal displacement field from fluctuation part of the deformation gradient field.
 
@@ -293,9 +410,12 @@ def node_displacement_fluct(size,F):
         physical size of the periodic field.
     F : numpy.ndarray
         deformation gradient field.
+    workers : int, optional
+        number of threads for the Fourier transforms.
+        Defaults to DAMASK_NUM_THREADS or, if not set, 1.
 
     """
-    return cell_2_node(cell_displacement_fluct(size,F))
+    return cell_2_node(cell_displacement_fluct(size,F,workers))
 
 
 def node_displacement_avg(size,F):
@@ -314,7 +434,7 @@ def node_displacement_avg(size,F):
     return _np.einsum('ml,ijkl->ijkm',F_avg - _np.eye(3),node_coord0(F.shape[:3],size))
 
 
-def node_displacement(size,F):
+def node_displacement(size,F,workers=None):
     """
     Nodal displacement field from deformation gradient field.
 
@@ -324,12 +444,15 @@ def node_displacement(size,F):
         physical size of the periodic field.
     F : numpy.ndarray
         deformation gradient field.
+    workers : int, optional
+        number of threads for the Fourier transforms.
+        Defaults to DAMASK_NUM_THREADS or, if not set, 1.
 
     """
-    return node_displacement_avg(size,F) + node_displacement_fluct(size,F)
+    return node_displacement_avg(size,F) + node_displacement_fluct(size,F,workers)
 
 
-def node_coord(size,F,origin=_np.zeros(3)):
+def node_coord(size,F,origin=_np.zeros(3),workers=None):
     """
     Nodal positions.
 
@@ -341,9 +464,12 @@ def node_coord(size,F,origin=_np.zeros(3)):
         deformation gradient field.
     origin : numpy.ndarray of shape (3), optional
         physical origin of the periodic field. Defaults to [0.0,0.0,0.0].
+    workers : int, optional
+        number of threads for the Fourier transforms.
+        Defaults to DAMASK_NUM_THREADS or, if not set, 1.
 
     """
-    return node_coord0(F.shape[:3],size,origin) + node_displacement(size,F)
+    return node_coord0(F.shape[:3],size,origin) + node_displacement(size,F,workers)
 
 
 def cell_2_node(cell_data):
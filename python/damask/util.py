@@ -1,15 +1,18 @@
 import sys
 import datetime
 import os
+import time
 import subprocess
 import shlex
 import fractions
 from functools import reduce
 from optparse import Option
+from concurrent import futures
 
 import numpy as np
 
 from . import version
+from . import environment
 
 # limit visibility
 __all__=[
@@ -182,6 +185,82 @@ def scale_to_coprime(v):
     return m
 
 
+def _num_workers(N_workers=None,default=None):
+    """
+    Number of workers (processes or threads).
+
+    Parameters
+    ----------
+    N_workers : int, optional
+        Requested number of workers.
+    default : int, optional
+        Number of workers if neither requested nor DAMASK_NUM_THREADS is set.
+        Defaults to None, i.e. the number of CPUs.
+
+    """
+    if N_workers is not None:
+        return N_workers
+    num_threads = environment.options['DAMASK_NUM_THREADS']
+    if num_threads is not None:
+        return int(num_threads)
+    return os.cpu_count() if default is None else default
+
+
+def _pid(delay=0.0):
+    """Process ID after a delay, i.e. a task that keeps a worker busy."""
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _start_workers(pool,N_workers):
+    """
+    Start all workers of a pool of processes.
+
+    Depending on Python version and start method, ProcessPoolExecutor
+    starts workers on demand. Workers started later would be forked
+    from a process that has opened files or started threads meanwhile.
+
+    Parameters
+    ----------
+    pool : concurrent.futures.Executor
+        Pool of workers, only a ProcessPoolExecutor is affected.
+    N_workers : int
+        Number of workers of the pool.
+
+    """
+    if not isinstance(pool,futures.ProcessPoolExecutor): return
+    pids = set()
+    while len(pids) < N_workers:
+        pids |= {future.result() for future in [pool.submit(_pid,0.01) for _ in range(N_workers)]}
+
+
+def _executor(kind='process',N_workers=None):
+    """
+    Executor to run tasks concurrently.
+
+    Parameters
+    ----------
+    kind : {'process', 'thread', 'serial'}, optional
+        Pool of worker processes (arguments and results are pickled),
+        pool of threads (shared memory, requires GIL-releasing tasks
+        such as NumPy operations or HDF5 reads), or execution on submission.
+        Defaults to 'process'.
+    N_workers : int, optional
+        Number of workers. Defaults to DAMASK_NUM_THREADS or,
+        if not set, the number of CPUs.
+
+    """
+    N_workers = _num_workers(N_workers)
+    if   kind == 'process':
+        return futures.ProcessPoolExecutor(N_workers)
+    elif kind == 'thread':
+        return futures.ThreadPoolExecutor(N_workers)
+    elif kind == 'serial':
+        return _SerialExecutor()
+    else:
+        raise ValueError(f'invalid executor "{kind}"')
+
+
 def execution_stamp(class_name,function_name=None):
     """Timestamp the execution of a (function within a) class."""
     now = datetime.datetime.now().astimezone().strftime('%Y-%m-%d %H:%M:%S%z')
@@ -277,6 +356,145 @@ class _ProgressBar:
             sys.stderr.flush()
 
 
+class _Moments:
+    """
+    Mergeable accumulator for count, mean, variance, minimum, and maximum.
+
+    Mean and variance are accumulated with Welford's algorithm and
+    combined with the parallel variant of Chan et al.
+    """
+
+    def __init__(self,x=None):
+        """
+        Accumulate moments of data.
+
+        Parameters
+        ----------
+        x : numpy.ndarray of shape (:,...), optional
+            Data, statistics are accumulated along axis 0.
+
+        """
+        self.count = 0
+        self.mean = self.M2 = self.min = self.max = None
+        if x is not None and len(x) > 0:
+            self.count = len(x)
+            self.mean  = np.mean(x,axis=0)
+            self.M2    = np.sum((x-self.mean)**2,axis=0)
+            self.min   = np.min(x,axis=0)
+            self.max   = np.max(x,axis=0)
+
+    def merge(self,other):
+        """Combine with accumulator of other data."""
+        if other.count == 0: return self
+        if self.count == 0:
+            self.count,self.mean,self.M2,self.min,self.max = other.count,other.mean,other.M2,other.min,other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean  = self.mean + delta*other.count/count
+        self.M2    = self.M2 + other.M2 + delta**2*self.count*other.count/count
+        self.min   = np.minimum(self.min,other.min)
+        self.max   = np.maximum(self.max,other.max)
+        self.count = count
+        return self
+
+    @property
+    def std(self):
+        """Population standard deviation."""
+        return np.sqrt(self.M2/self.count)
+
+
+class _QuantileSketch:
+    """
+    Mergeable approximation of the distribution of data for quantile estimation.
+
+    The data is represented by at most 'size' weighted points (per component).
+    The rank error of estimated quantiles is of the order 1/size.
+    """
+
+    def __init__(self,x=None,size=1000):
+        """
+        Summarize data.
+
+        Parameters
+        ----------
+        x : numpy.ndarray of shape (:,...), optional
+            Data, quantiles are estimated along axis 0.
+        size : int, optional
+            Maximum number of points to represent the data. Defaults to 1000.
+
+        """
+        self.size = size
+        self.points = []
+        if x is not None and len(x) > 0:
+            x_ = x.reshape(len(x),-1)
+            self.shape = x.shape[1:]
+            self.points = [self._compress(x_[:,i],np.ones(len(x))) for i in range(x_.shape[1])]
+
+    def _compress(self,values,weights):
+        order = np.argsort(values,kind='stable')
+        values,weights = values[order],weights[order]
+        if len(values) <= self.size: return values,weights
+        cumulative = np.cumsum(weights) - .5*weights
+        total = np.sum(weights)
+        return np.interp((np.arange(self.size)+.5)/self.size*total,cumulative,values),np.full(self.size,total/self.size)
+
+    def merge(self,other):
+        """Combine with sketch of other data."""
+        if not other.points: return self
+        if not self.points:
+            self.points,self.shape = other.points,other.shape
+            return self
+        self.points = [self._compress(np.concatenate((a[0],b[0])),np.concatenate((a[1],b[1])))
+                       for a,b in zip(self.points,other.points)]
+        return self
+
+    def quantile(self,q):
+        """Estimated quantile, q in [0,1]."""
+        return np.array([np.interp(q*np.sum(w),np.cumsum(w)-.5*w,v) for v,w in self.points]).reshape(self.shape)
+
+
+class _Histogram:
+    """Mergeable histogram with fixed bins (per component)."""
+
+    def __init__(self,bins,x=None):
+        """
+        Count data in bins.
+
+        Parameters
+        ----------
+        bins : numpy.ndarray
+            Bin edges.
+        x : numpy.ndarray of shape (:,...), optional
+            Data, counted along axis 0.
+
+        """
+        self.bins = bins
+        self.counts = None
+        if x is not None and len(x) > 0:
+            x_ = x.reshape(len(x),-1)
+            self.counts = np.array([np.histogram(x_[:,i],bins)[0] for i in range(x_.shape[1])]) \
+                            .reshape(x.shape[1:]+(len(bins)-1,))
+
+    def merge(self,other):
+        """Combine with histogram of other data."""
+        if other.counts is not None:
+            self.counts = other.counts if self.counts is None else self.counts + other.counts
+        return self
+
+
+class _SerialExecutor(futures.Executor):
+    """Executor that runs each task on submission in the calling thread."""
+
+    def submit(self,fn,*args,**kwargs):
+        future = futures.Future()
+        try:
+            future.set_result(fn(*args,**kwargs))
+        except BaseException as err:
+            future.set_exception(err)
+        return future
+
+
 class bcolors:
     """
     ASCII colors.
@@ -303,13 +303,15 @@ class TestGeom:
 
 
     @pytest.mark.parametrize('periodic',[True,False])
-    def test_tessellation_approaches(self,periodic):
+    @pytest.mark.parametrize('executor',['process','thread','serial'])
+    def test_tessellation_approaches(self,periodic,executor):
         grid   = np.random.randint(10,20,3)
         size   = np.random.random(3) + 1.0
         N_seeds= np.random.randint(10,30)
         seeds  = np.random.rand(N_seeds,3) * np.broadcast_to(size,(N_seeds,3))
         Voronoi  = Geom.from_Voronoi_tessellation( grid,size,seeds,                 np.arange(N_seeds)+5,periodic)
-        Laguerre = Geom.from_Laguerre_tessellation(grid,size,seeds,np.ones(N_seeds),np.arange(N_seeds)+5,periodic)
+        Laguerre = Geom.from_Laguerre_tessellation(grid,size,seeds,np.ones(N_seeds),np.arange(N_seeds)+5,periodic,
+                                                   executor=executor)
         assert geom_equal(Laguerre,Voronoi)
 
 
@@ -1,5 +1,8 @@
 import time
 import shutil
+import threading
+import multiprocessing
+from concurrent import futures
 import os
 import sys
 from datetime import datetime
@@ -7,12 +10,18 @@ from datetime import datetime
 import pytest
 import numpy as np
 import h5py
+import pandas as pd
 
+import damask
 from damask import Result
+from damask import Table
 from damask import Rotation
 from damask import Orientation
 from damask import mechanics
 from damask import grid_filters
+from damask import Geom
+from damask import util
+from damask._result import _Formula
 
 @pytest.fixture
 def default(tmp_path,reference_dir):
@@ -36,6 +45,15 @@ def reference_dir(reference_dir_base):
     return reference_dir_base/'Result'
 
 
+def write_increment(fname,reference,written,done):
+    """Add inc40 like a running simulation, keeping the file open."""
+    with h5py.File(fname,'a') as f, h5py.File(reference,'r') as f_ref:
+        f_ref.copy('inc40',f)
+        f.flush()
+        written.set()
+        done.wait(10)
+
+
 class TestResult:
 
     def test_self_report(self,default):
@@ -93,6 +111,526 @@ class TestResult:
         with pytest.raises(AttributeError):
             default.pick('invalid',True)
 
+    def test_session(self,default):
+        loc_closed = default.get_dataset_location('F')
+        F_closed   = default.read_dataset(loc_closed)
+        with default.open() as r:
+            assert r.get_dataset_location('F') == loc_closed
+            assert np.all(r.read_dataset(loc_closed) == F_closed)
+            r.add_Cauchy()
+            assert len(r.get_dataset_location('sigma')) == len(loc_closed)
+        assert default._handle is None
+
+    def test_index_update(self,default):
+        default.add_Cauchy()
+        default.allow_modification()
+        default.rename('F','F_renamed')
+        reindexed = Result(default.fname)
+        assert default._index.keys() == reindexed._index.keys()
+        for inc in default.increments:
+            for o in ['geometry','constituent','materialpoint']:
+                assert default._index[inc][o] == reindexed._index[inc][o]
+
+    @pytest.mark.parametrize('what',['constituent','materialpoint'])
+    def test_mapping(self,default,what):
+        with h5py.File(default.fname,'r') as f:
+            mapping = f[f'mapping/cellResults/{what}'][()]
+        if what == 'constituent': mapping = mapping[:,0]
+        for name,(cells,positions) in default._mapping(what).items():
+            assert np.all(cells == np.where(mapping['Name'] == name.encode())[0])
+            assert np.all(positions == mapping['Position'][cells])
+
+    def test_pipeline_statistics(self,default):
+        default.add_Cauchy()
+        assert default.pipeline_statistics.keys() == {'read','compute','write'}
+        assert all(s['size/MB'] > 0.0 for s in default.pipeline_statistics.values())
+
+    def test_defer(self,default):
+        default.defer()
+        default.add_Mises('sigma')
+        default.add_Cauchy()
+        default.add_pole('O',np.array([1.,0.,0.]))
+        assert default.get_dataset_location('sigma') == []
+        default.compute()
+        loc = {'F':       default.get_dataset_location('F'),
+               'P':       default.get_dataset_location('P'),
+               'sigma_vM':default.get_dataset_location('sigma_vM')}
+        in_memory = mechanics.Mises_stress(mechanics.Cauchy(default.read_dataset(loc['P'],0),
+                                                            default.read_dataset(loc['F'],0))).reshape(-1,1)
+        in_file   = default.read_dataset(loc['sigma_vM'],0)
+        assert np.allclose(in_memory,in_file) and default._deferred is None
+
+    @pytest.mark.parametrize('Cauchy_first',[True,False])
+    def test_defer_modification(self,default,Cauchy_first):
+        default.add_Cauchy()
+        default.allow_modification()
+        default.add_calculation('sigma','#sigma#*0.0')
+        default.defer()
+        if Cauchy_first: default.add_Cauchy()
+        default.add_Mises('sigma')
+        if not Cauchy_first: default.add_Cauchy()
+        default.compute()
+        loc = {'F':       default.get_dataset_location('F'),
+               'P':       default.get_dataset_location('P'),
+               'sigma_vM':default.get_dataset_location('sigma_vM')}
+        in_memory = mechanics.Mises_stress(mechanics.Cauchy(default.read_dataset(loc['P'],0),
+                                                            default.read_dataset(loc['F'],0))).reshape(-1,1)
+        assert np.allclose(in_memory,default.read_dataset(loc['sigma_vM'],0))
+
+    def test_defer_missing(self,default,capsys):
+        default.defer()
+        default.add_Cauchy()
+        default.add_Mises('missing')
+        default.compute()
+        assert default.get_dataset_location('sigma') != []
+        assert 'No matching dataset found' in capsys.readouterr().out
+
+    def test_write_error(self,default,monkeypatch):
+        def fail(*args,**kwargs):
+            raise RuntimeError('write failed')
+        monkeypatch.setattr(default,'_write_dataset',fail)
+        default.set_chunk_size(10)                                                                  # reader blocks on full buffer
+        N_threads = threading.active_count()
+        with pytest.raises(RuntimeError):
+            default.add_Cauchy()
+        assert threading.active_count() == N_threads
+
+    @pytest.mark.parametrize('criterion',[{'box':[[0.,0.,.4],[1.,1.,.6]]},
+                                          {'grid_indices':[[5,6,7],[0,0,0],[2,3,4]]},
+                                          {'constituents':'1_pheno_fcc'},
+                                          {'mask':np.random.rand(6*7*8)>.8},
+                                          {'constituents':['1_pheno_fcc','2_pheno_bcc'],'box':[[0.,0.,0.],[.1,1.,1.]]}])
+    def test_read_dataset_roi(self,default,criterion):
+        roi = default.roi(**criterion)
+        for label in ['F','O','u_p']:
+            loc = default.get_dataset_location(label)
+            assert np.array_equal(default.read_dataset(loc)[roi],default.read_dataset(loc,roi=roi),equal_nan=True) \
+                   if label != 'O' else \
+                   np.all(default.read_dataset(loc)[roi] == default.read_dataset(loc,roi=roi))
+
+    def test_place_roi(self,default):
+        roi = default.roi(box=[[0.,0.,.4],[1.,1.,.6]])
+        for inc,tbl in default.place('F').items():
+            tbl_roi = default.place('F',roi=roi)[inc]
+            assert np.array_equal(tbl.data.to_numpy()[roi],tbl_roi.data.to_numpy(),equal_nan=True)
+
+    def test_place_geometry_roi(self,default):
+        roi = default.roi(box=[[0.,0.,.4],[1.,1.,.6]])
+        u_p = default.read_dataset(default.get_dataset_location('u_p'))
+        tbl = default.place(['u_p','F'],roi=roi,split=False)
+        assert np.array_equal(tbl.get(default.get_dataset_location('u_p')[0]),u_p[roi])
+        assert default.place('u_n') == {}                                                           # nodal data
+
+    @pytest.mark.parametrize('points',[np.array([3,0,100,3]),np.array([[.0,.0,.0],[.7,.8,.9]])])
+    def test_probe(self,default,points):
+        default.pick('times',True)
+        probes = default.probe(points,['F','u_p'])
+        cells = points if points.dtype == int else \
+                [np.argmin(np.linalg.norm(default.cell_coordinates-p,axis=1)) for p in points]
+        for label in ['F','u_p']:
+            assert probes[label].shape[:2] == (len(default.increments),len(points))
+            for inc,probe in zip(default.increments,probes[label]):
+                default.pick('increments',inc)
+                assert np.array_equal(default.read_dataset(default.get_dataset_location(label))[cells],probe)
+
+    @pytest.mark.parametrize('by',['increment','phase'])
+    def test_reduce(self,default,by):
+        default.pick('times',True)
+        default.add_Cauchy()
+        default.add_Mises('sigma')
+        statistics = default.reduce('sigma_vM',['count','mean','std','min','max','p50','histogram'],by,chunk_size=50)
+        for path in default.get_dataset_location('sigma_vM'):
+            with h5py.File(default.fname,'r') as f:
+                x = f[path][()]
+            s = statistics[path.split('/')[0] if by == 'increment' else (path.split('/')[0],path.split('/')[2])]
+            if by == 'phase':
+                assert s['count'] == len(x) and np.sum(s['histogram'][0]) == len(x)
+                assert np.allclose([s['mean'],s['std'],s['min'],s['max'],s['p50']],
+                                   [np.mean(x),np.std(x),np.min(x),np.max(x),np.median(x)])
+            else:
+                assert s['count'] == default.Nmaterialpoints
+
+    @pytest.mark.parametrize('N_rows',[1,17,1000])
+    def test_chunked(self,default,N_rows):
+        default.set_chunk_size(N_rows)
+        default.add_Cauchy()
+        default.add_eigenvalue('sigma')
+        loc = {'F':     default.get_dataset_location('F'),
+               'P':     default.get_dataset_location('P'),
+               'lambda':default.get_dataset_location('lambda_max(sigma)')}
+        in_memory = np.max(mechanics.eigenvalues(mechanics.Cauchy(default.read_dataset(loc['P'],0),
+                                                                   default.read_dataset(loc['F'],0))),axis=1,keepdims=True)
+        in_file   = default.read_dataset(loc['lambda'],0)
+        assert np.allclose(in_memory,in_file)
+
+    def test_refresh_follow(self,default,reference_dir):
+        with h5py.File(default.fname,'a') as f:
+            del f['inc40']
+        growing = Result(default.fname)
+        assert growing.refresh() == []
+        with h5py.File(reference_dir/'12grains6x7x8_tensionY.hdf5','r') as f_ref, \
+             h5py.File(default.fname,'a') as f:
+            f_ref.copy('inc40',f)
+        assert list(growing.follow(interval=.1,timeout=.5)) == ['inc40']
+        assert growing.increments == default.increments and growing.times == default.times
+        assert growing.get_dataset_location('F') == Result(default.fname).get_dataset_location('F')
+
+    def test_follow_locked(self,default,reference_dir):
+        with h5py.File(default.fname,'a') as f:
+            del f['inc40']
+        growing = Result(default.fname).open()
+        ctx = multiprocessing.get_context('spawn')                                                  # no inherited HDF5 state
+        written,done = ctx.Event(),ctx.Event()
+        writer = ctx.Process(target=write_increment,
+                                         args=(default.fname,reference_dir/'12grains6x7x8_tensionY.hdf5',written,done))
+        writer.start()
+        try:
+            assert written.wait(10)
+            assert list(growing.follow(interval=.1,timeout=.5)) == ['inc40']
+            assert growing._handle is not None
+        finally:
+            done.set()
+            writer.join()
+        growing.close()
+
+    def test_refresh_current(self,default,reference_dir):
+        with h5py.File(default.fname,'a') as f:
+            del f['inc40']
+            f['current'] = h5py.SoftLink('/inc32')
+        assert 'inc32' in Result(default.fname).increments
+        with h5py.File(reference_dir/'12grains6x7x8_tensionY.hdf5','r') as f_ref, \
+             h5py.File(default.fname,'a') as f:
+            f_ref.copy('inc40',f)
+            del f['current']
+            f['current'] = h5py.SoftLink('/inc40')
+        growing = Result(default.fname)
+        assert 'inc40' not in growing.increments and 'inc36' in growing.increments
+        assert growing.refresh() == []
+        with h5py.File(default.fname,'a') as f:
+            del f['current']
+        assert list(growing.follow(interval=.1,timeout=.5)) == ['inc40']
+
+    def test_sidecar(self,default,tmp_path):
+        with open(default.fname,'rb') as f:
+            before = f.read()
+        derived = Result(default.fname,tmp_path/'derived.hdf5')
+        derived.pick('times',20.0)
+        with derived:
+            derived.add_Cauchy()
+            derived.add_Mises('sigma')
+        with open(default.fname,'rb') as f:
+            assert f.read() == before
+        assert default.get_dataset_location('sigma') == []
+        reopened = Result(default.fname,tmp_path/'derived.hdf5')
+        assert reopened.get_dataset_location('sigma_vM') == derived.get_dataset_location('sigma_vM') != []
+        default.add_Cauchy()
+        loc = default.get_dataset_location('sigma')
+        assert np.array_equal(reopened.read_dataset(loc,0),default.read_dataset(loc,0))
+
+    def test_sidecar_rename(self,default,tmp_path):
+        derived = Result(default.fname,tmp_path/'derived.hdf5')
+        derived.pick('times',20.0)
+        derived.add_Cauchy()
+        derived.allow_modification()
+        derived.rename('sigma','Cauchy')
+        assert derived.get_dataset_location('sigma') == [] and derived.get_dataset_location('Cauchy')
+        with pytest.raises(PermissionError):
+            derived.rename('F','F_renamed')
+        assert derived.get_dataset_location('F')
+        assert Result(default.fname,tmp_path/'derived.hdf5').view(times=20.0).get_dataset_location('Cauchy')
+
+    def test_sidecar_other_file(self,default,tmp_path,reference_dir):
+        Result(default.fname,tmp_path/'derived.hdf5')
+        shutil.copy(reference_dir/'6grains6x7x8_single_phase_tensionY.hdf5',tmp_path)
+        with pytest.raises(ValueError):
+            Result(tmp_path/'6grains6x7x8_single_phase_tensionY.hdf5',tmp_path/'derived.hdf5')
+
+    def test_cache(self,default):
+        default.add_Cauchy()
+        loc = default.get_dataset_location('sigma')
+        default.read_dataset(loc)
+        assert default.cache_statistics['hits'] == 0 and default.cache_statistics['misses'] == 0
+        default.set_cache_size(2**30)
+        first = default.read_dataset(loc)
+        first[...] = 0.
+        assert not np.allclose(default.read_dataset(loc),0.)
+        assert default.cache_statistics['hits'] == 1 and default.cache_statistics['misses'] == 1
+        default.place('sigma')
+        before = default.cache_statistics
+        default.place('sigma')
+        assert default.cache_statistics['misses'] == before['misses'] \
+           and default.cache_statistics['hits'] == before['hits'] + len(default.get_dataset_location('sigma'))
+        default.allow_modification()
+        default.add_calculation('sigma','#sigma#*0.0+311.','not the Cauchy stress')
+        assert np.allclose(default.read_dataset(loc),311.)
+        default.set_cache_size(first.nbytes)
+        assert 0 < default.cache_statistics['size/MB']*1024**2 <= first.nbytes
+
+    @pytest.mark.parametrize('options',[{'chunks':100},
+                                        {'chunks':True,'compression':'lzf'},
+                                        {'compression':'gzip','compression_opts':9,'shuffle':True}])
+    @pytest.mark.parametrize('dtype',[None,np.float32])
+    def test_write_options(self,default,options,dtype):
+        default.set_write_options(**options,dtype=dtype)
+        default.add_Cauchy()
+        loc = default.get_dataset_location('sigma')
+        with h5py.File(default.fname,'r') as f:
+            assert f[loc[0]].compression == options.get('compression') \
+               and f[loc[0]].shuffle == options.get('shuffle',False) \
+               and f[loc[0]].dtype == (np.float64 if dtype is None else dtype)
+            if options.get('chunks') == 100: assert f[loc[0]].chunks[0] == 100
+        in_memory = mechanics.Cauchy(default.read_dataset(default.get_dataset_location('P'),0),
+                                     default.read_dataset(default.get_dataset_location('F'),0))
+        assert np.allclose(in_memory,default.read_dataset(loc,0),rtol=1e-6)
+
+    def test_repack(self,default):
+        default.allow_modification()
+        default.add_Cauchy()
+        for _ in range(3):
+            default.add_calculation('sigma','#sigma#*2.')
+        size = os.path.getsize(default.fname)
+        loc = default.get_dataset_location('sigma')
+        sigma = default.read_dataset(loc)
+        default.repack()
+        assert os.path.getsize(default.fname) < size
+        repacked = Result(default.fname)
+        assert repacked.get_dataset_location('sigma') == loc and np.array_equal(repacked.read_dataset(loc),sigma)
+        assert repacked.list_data() == Result(default.fname).list_data()
+
+    def test_place(self,default):
+        tbl = default.place(['F','P'],split=False)
+        for label in ['F','P']:
+            for path in default.get_dataset_location(label):
+                assert path in tbl.labels
+
+    @pytest.mark.parametrize('format',['npz','parquet'])
+    def test_export_columnar(self,default,tmp_path,format):
+        if format != 'npz': pytest.importorskip('pyarrow')
+        os.chdir(tmp_path)
+        default.pick('increments',default.increments[-2:])
+        default.export_columnar(['F','T'],format)
+        for inc,tbl in default.place(['F','T']).items():
+            exported = getattr(Table,f'load_{format}')(tmp_path/f'{default.fname.stem}_inc{inc[3:]}.{format}')
+            assert np.allclose(exported.get('pos'),default.cell_coordinates)
+            for label in tbl.labels:
+                assert np.array_equal(exported.get(label),tbl.get(label),equal_nan=True)
+
+    def test_view(self,default):
+        default.pick('increments',True)
+        v = default.view(increments=default.increments[-1],constituents=default.constituents[:1])
+        assert v.selection['increments'] == default.increments[-1:] \
+           and default.selection['increments'] == default.increments \
+           and v.get_dataset_location('F') == [default.get_dataset_location('F')[-2]]
+        with pytest.raises(PermissionError):
+            v.pick('increments',True)
+        assert repr(default) == repr(default)
+
+    def test_view_concurrent(self,default):
+        default.pick('increments',True)
+        with default, futures.ThreadPoolExecutor(4) as executor:
+            views = [default.view(increments=i) for i in default.increments]
+            list(executor.map(lambda v: v.add_Cauchy(),views))
+            sigma = list(executor.map(lambda v: v.read_dataset(v.get_dataset_location('sigma')),views))
+        for v,s in zip(views,sigma):
+            assert np.allclose(s,mechanics.Cauchy(v.read_dataset(v.get_dataset_location('P')),
+                                                  v.read_dataset(v.get_dataset_location('F'))))
+        assert len(default.get_dataset_location('sigma')) == len(default.get_dataset_location('P'))
+
+    @pytest.mark.parametrize('session',[True,False])
+    def test_view_parallel_read(self,default,session):
+        barrier = threading.Barrier(2,timeout=10)
+        def read(v):
+            with v._file() as f:
+                barrier.wait()                                                                      # both threads inside
+                return f[v.get_dataset_location('F')[0]].shape
+        if session: default.open()
+        with futures.ThreadPoolExecutor(2) as executor:
+            assert len(set(executor.map(read,[default.view(),default.view()]))) == 1
+        default.close()
+
+    @pytest.mark.parametrize('executor',['thread','serial'])
+    def test_view_concurrent_writers(self,default,executor):
+        default.pick('increments',True)
+        default.set_executor(executor)
+        with futures.ThreadPoolExecutor(4) as pool:
+            views = [default.view(increments=i) for i in default.increments]
+            list(pool.map(lambda v: v.add_determinant('F'),views))
+        assert len(default.get_dataset_location('det(F)')) == len(default.get_dataset_location('F'))
+
+    def test_view_deferred(self,default):
+        default.defer()
+        v = default.view()
+        v.add_Cauchy()
+        assert v.get_dataset_location('sigma') and default._deferred == []
+        default.compute()
+
+    def test_view_user_function(self,default):
+        def twice(x):
+            return 2.0*x
+        v = default.view()
+        v.enable_user_function(twice)
+        v.add_calculation('x','twice(#F#)')
+        assert default._functions == {}
+        with pytest.raises(ValueError):
+            default.add_calculation('y','twice(#F#)')
+
+    def test_formula_registry(self):
+        def twice(x):
+            return 2.0*x
+        f = _Formula('twice(#F#)',{'twice':twice})
+        token = f.token
+        assert _Formula._alive[token] is f
+        del f
+        assert token not in _Formula._alive and _Formula('#F#').token != token
+
+    @pytest.mark.parametrize('executor',['process','thread','serial'])
+    def test_executor(self,default,tmp_path,executor):
+        default.set_executor(executor)
+        default.add_Cauchy()
+        loc = {'F':     default.get_dataset_location('F'),
+               'P':     default.get_dataset_location('P'),
+               'sigma': default.get_dataset_location('sigma')}
+        in_memory = mechanics.Cauchy(default.read_dataset(loc['P'],0),default.read_dataset(loc['F'],0))
+        assert np.allclose(in_memory,default.read_dataset(loc['sigma'],0))
+        os.chdir(tmp_path)
+        default.save_vtk('sigma')
+        assert len(list(tmp_path.glob('*.vtr'))) == len(default.selection['increments'])
+
+    def test_executor_invalid(self,default):
+        with pytest.raises(ValueError):
+            default.set_executor('invalid')
+
+    @pytest.mark.parametrize('op',['count','sum','mean','std','min','max'])
+    @pytest.mark.parametrize('by',['phase','material'])
+    def test_groupby(self,default,reference_dir,op,by):
+        default.pick('times',True)
+        default.add_Cauchy()
+        default.add_calculation('V','np.ones(#F#.shape[0])*1.5')
+        if by == 'phase':
+            keys = np.array([n.decode() for n in h5py.File(default.fname,'r')['mapping/cellResults/constituent']['Name'][:,0]])
+        else:
+            keys = Geom.load(reference_dir/'12grains6x7x8.vtr').material.flatten(order='F')
+        grouped = default.groupby(keys if by == 'material' else by)
+        weights = np.random.rand(len(keys))
+        for label in ['sigma','xi_sl']:
+            result = getattr(grouped,op)(label)
+            weighted = grouped.mean(label,weights) if op == 'mean' else None
+            for inc,path in zip(default.selection['increments'],default.get_dataset_location(label)[::2]):
+                x = default.view(increments=inc).read_dataset(default.view(increments=inc).get_dataset_location(label),0)
+                x = x.reshape(len(x),-1)
+                df = pd.DataFrame(x).groupby(keys)
+                expected = df.size().values if op == 'count' else getattr(df,op)(**({'ddof':0} if op == 'std' else {})).values
+                assert np.allclose(result[inc].reshape(len(grouped.keys),-1).squeeze(),expected.squeeze())
+                if weighted is not None:
+                    expected = np.array([np.average(x[keys==k],axis=0,weights=weights[keys==k]) for k in grouped.keys])
+                    assert np.allclose(weighted[inc].reshape(len(grouped.keys),-1),expected)
+        assert np.allclose(grouped.mean('sigma','V')[inc],grouped.mean('sigma')[inc])
+
+    def test_groupby_orientation(self,default,reference_dir):
+        material = Geom.load(reference_dir/'12grains6x7x8.vtr').material.flatten(order='F')
+        grouped = default.groupby(material)
+        q = grouped.mean('O')[default.selection['increments'][0]]
+        O = default.read_dataset(default.get_dataset_location('O'),0,plain=True)
+        lattice = {n.decode():default._index_lookup(p)['attrs']['Lattice']
+                   for p in default.get_dataset_location('O') for n in [p.split('/')[2].encode()]}
+        phases = h5py.File(default.fname,'r')['mapping/cellResults/constituent']['Name'][:,0]
+        for k,q_k in zip(grouped.keys,q):
+            members = Orientation(Rotation(O[material==k]),lattice[phases[material==k][0].decode()])
+            cos = np.max(np.abs(np.sum(members.equivalent.rotation.quaternion*q_k,axis=-1)),axis=0)
+            assert np.all(2*np.arccos(np.clip(cos,-1,1)) < np.radians(10))
+            assert np.isclose(np.linalg.norm(q_k),1.0)
+
+    def test_groupby_invalid(self,default):
+        with pytest.raises(ValueError):
+            default.groupby('material')
+        with pytest.raises(ValueError):
+            default.groupby(np.ones(3))
+
+    def test_compare_self(self,default,tmp_path):
+        shutil.copy(default.fname,tmp_path/'other.hdf5')
+        report = default.compare(tmp_path/'other.hdf5',chunk_size=100)
+        assert report and all(r['equal'] and r['max abs error'] == 0.0 for r in report.values())
+
+    @pytest.mark.parametrize('early_exit',[True,False])
+    def test_compare_different(self,default,tmp_path,early_exit):
+        shutil.copy(default.fname,tmp_path/'other.hdf5')
+        path = default.get_dataset_location('F')[0]
+        with h5py.File(tmp_path/'other.hdf5','a') as f:
+            f[path][150] += 1e-3
+        report = default.compare(tmp_path/'other.hdf5',labels='F',chunk_size=100,early_exit=early_exit)
+        assert not report[path]['equal'] and np.isclose(report[path]['max abs error'],1e-3)
+        assert early_exit == (list(report)[-1] == path)
+        assert default.compare(tmp_path/'other.hdf5',labels='F',rtol=1e-2,atol=1e-2)[path]['equal']
+
+    def test_compare_missing(self,default,tmp_path):
+        shutil.copy(default.fname,tmp_path/'other.hdf5')
+        default.add_Cauchy()
+        report = default.compare(tmp_path/'other.hdf5',early_exit=False)
+        assert {r['message'] for r in report.values() if not r['equal']} == {'missing in other'}
+
+    def test_compare_geometry(self,default,tmp_path):
+        shutil.copy(default.fname,tmp_path/'other.hdf5')
+        path = default.get_dataset_location('u_p')[0]
+        with h5py.File(tmp_path/'other.hdf5','a') as f:
+            f[path][0] += 1.0
+        assert not default.compare(tmp_path/'other.hdf5')[path]['equal']
+
+    def test_compare_missing_increment(self,default,tmp_path):
+        shutil.copy(default.fname,tmp_path/'other.hdf5')
+        with h5py.File(default.fname,'a') as f:
+            f['inc44'] = f['inc40']
+            f['inc44'].attrs['time/s'] = 22.0
+        with h5py.File(tmp_path/'other.hdf5','a') as f:
+            f['inc48'] = f['inc40']
+            f['inc48'].attrs['time/s'] = 24.0
+        mine = Result(default.fname).view(increments=['inc40','inc44'])
+        report = mine.compare(tmp_path/'other.hdf5',early_exit=False)
+        assert {r['message'] for p,r in report.items() if p.startswith('inc44')} == {'missing in other'}
+        assert {r['message'] for p,r in report.items() if p.startswith('inc48')} == {'missing'}
+        assert all(r['equal'] for p,r in report.items() if p.startswith('inc40'))
+        assert not any(p.startswith('inc36') for p in report)
+
+    def test_MPI(self,default):
+        """Also works with 'mpirun -n 4 python -m pytest -k MPI'."""
+        MPI = pytest.importorskip('mpi4py.MPI')
+        if not h5py.get_config().mpi: pytest.skip('h5py without MPI support')
+        r = Result(MPI.COMM_WORLD.bcast(default.fname))                                             # same file on all ranks
+        r.pick('times',20.0)
+        r.set_communicator(MPI.COMM_WORLD)
+        r.add_Cauchy()
+        distributed = r.reduce('sigma',['mean','max'])
+        r.set_communicator()
+        loc = {'F':     r.get_dataset_location('F'),
+               'P':     r.get_dataset_location('P'),
+               'sigma': r.get_dataset_location('sigma')}
+        assert np.allclose(mechanics.Cauchy(r.read_dataset(loc['P'],0),r.read_dataset(loc['F'],0)),
+                           r.read_dataset(loc['sigma'],0))
+        serial = r.reduce('sigma',['mean','max'])
+        for inc in serial:
+            assert np.allclose(serial[inc]['mean'],distributed[inc]['mean'])
+            assert np.allclose(serial[inc]['max'],distributed[inc]['max'])
+
+    def test_MPI_failed_calculation(self,default):
+        """Also works with 'mpirun -n 4 python -m pytest -k MPI'."""
+        MPI = pytest.importorskip('mpi4py.MPI')
+        if not h5py.get_config().mpi: pytest.skip('h5py without MPI support')
+        def fail_on_first_rank(x):
+            if MPI.COMM_WORLD.Get_rank() == 0: raise ValueError('failed')
+            return x
+        r = Result(MPI.COMM_WORLD.bcast(default.fname))
+        r.pick('times',20.0)
+        r.set_communicator(MPI.COMM_WORLD)
+        r.enable_user_function(fail_on_first_rank)
+        r.add_calculation('x','fail_on_first_rank(#F#)')
+        r.add_Cauchy()
+        assert r.get_dataset_location('x') == [] and r.get_dataset_location('sigma')
+        r.set_communicator()
+
+    def test_MPI_unavailable(self,default):
+        if h5py.get_config().mpi: pytest.skip('h5py with MPI support')
+        with pytest.raises(NotImplementedError):
+            default.set_communicator(object())
+
     def test_add_absolute(self,default):
         default.add_absolute('F_e')
         loc = {'F_e':   default.get_dataset_location('F_e'),
@@ -120,6 +658,103 @@ class TestResult:
         in_file   = default.read_dataset(loc['x'],0)
         assert np.allclose(in_memory,in_file)
 
+    @pytest.mark.parametrize('formula',['2.0*np.abs(#F#)-1.0','np.sqrt(#F#[:,0,0])*2**3',
+                                        '#F#[...,0]>0.5','np.linalg.det(#F#)','#F#-np.mean(#F#,axis=0)'])
+    def test_add_calculation_blockwise(self,default,formula):
+        default.add_calculation('x',formula)
+        f = _Formula(formula)
+        f.block_bytes = 100
+        with h5py.File(default.fname,'r') as h:
+            for path in default.get_dataset_location('x'):
+                F = h[path.replace('/x','/F')][()]
+                x = eval(formula.replace('#F#','F'))
+                assert np.allclose(x,h[path][()]) and np.allclose(x,f({'F':F}))
+
+    @pytest.mark.parametrize('formula',['#F# if len(#F#) > 0 else None','#F#*(1 and 2)',
+                                        'np.array([#F#[:,i,i] for i in range(3)]).T','util.srepr(#F#)'])
+    def test_add_calculation_not_blockwise(self,default,formula):
+        with h5py.File(default.fname,'r') as h:
+            F = h[default.get_dataset_location('F')[0]][()]
+        f = _Formula(formula)
+        assert not f.blockwise and np.all(f({'F':F}) == eval(formula.replace('#F#','F'),{**globals(),'F':F}))
+
+    @pytest.mark.parametrize('executor',['process','thread'])
+    def test_add_calculation_local_function(self,default,executor):
+        def twice(x):
+            return 2.0*x
+        default.set_executor(executor)
+        default.enable_user_function(twice)
+        default.add_calculation('x','twice(#F#)')
+        assert len(default.get_dataset_location('x')) == len(default.get_dataset_location('F'))
+
+    def test_add_calculation_worker_error(self,default,monkeypatch,capsys):
+        class Forgetful(dict):
+            def __setitem__(self,key,value):
+                pass
+        def twice(x):
+            return 2.0*x
+        default.enable_user_function(twice)
+        monkeypatch.setattr(_Formula,'_alive',Forgetful())                                          # not inherited
+        default.add_calculation('x','twice(#F#)')
+        assert default.get_dataset_location('x') == []
+        assert 'twice' in capsys.readouterr().out
+
+    @pytest.mark.parametrize('formula',['unknown(#F#)','np.unknown(#F#)','#F#+','#missing#*2'])
+    def test_add_calculation_invalid(self,default,formula):
+        with pytest.raises(ValueError):
+            default.add_calculation('x',formula)
+
+    @pytest.mark.parametrize('operator,label',[('curl','F'),('curl','u_p'),('divergence','P'),('divergence','u_p'),
+                                               ('gradient','u_p'),('gradient','s')])
+    def test_add_grid_operator(self,default,operator,label):
+        default.pick('times',True)
+        default.add_calculation('s','np.linalg.det(#F#)')
+        getattr(default,f'add_{operator}')(label)
+        new = {'curl':'curl','divergence':'div','gradient':'grad'}[operator]+f'({label})'
+        grid = tuple(default.grid)
+        for inc in default.selection['increments']:
+            v = default.view(increments=inc)
+            x = v.read_dataset(v.get_dataset_location(label),0)
+            field = x.reshape(len(x),-1).reshape(grid+(-1,),order='F').reshape(grid+x.shape[1:])
+            y = getattr(grid_filters,operator)(default.size,field)
+            y = y.reshape(grid+(-1,)).reshape(-1,int(np.prod(y.shape[3:])),order='F')
+            assert np.allclose(y,v.read_dataset(v.get_dataset_location(new),0).reshape(len(y),-1))
+
+    def test_add_curl_compatible(self,default):
+        default.add_curl('F')
+        assert np.allclose(default.read_dataset(default.get_dataset_location('curl(F)'),0),0.0)
+
+    @pytest.mark.parametrize('mode',['cell','node'])
+    def test_add_displacement(self,default,mode):
+        default.add_displacement(mode=mode)
+        label = 'u_p(F)' if mode == 'cell' else 'u_n(F)'
+        loc = default.get_dataset_location(label)
+        F = default.read_dataset(default.get_dataset_location('F'),0)
+        F = F.reshape(len(F),-1).reshape(tuple(default.grid)+(9,),order='F').reshape(tuple(default.grid)+(3,3))
+        u = (grid_filters.cell_displacement if mode == 'cell' else grid_filters.node_displacement)(default.size,F)
+        assert np.allclose(u.reshape(-1,3,order='F'),default.read_dataset(loc,0))
+        with h5py.File(default.fname,'r') as f:
+            created = f[loc[0]].attrs['Created']
+        default.add_displacement(mode=mode)
+        with h5py.File(default.fname,'r') as f:
+            assert created == f[loc[0]].attrs['Created']
+
+    @pytest.mark.parametrize('mode',['cell','node'])
+    def test_deformed_coordinates(self,default,mode):
+        inc = default.selection['increments'][0]
+        x = default.deformed_coordinates(inc,mode)
+        u = default.read_dataset(default.get_dataset_location('u_p' if mode == 'cell' else 'u_n'),0)
+        assert np.allclose(x,(default.cell_coordinates if mode == 'cell' else default.node_coordinates)+u)
+
+    def test_deformed_coordinates_derived(self,default):
+        inc = default.selection['increments'][0]
+        with h5py.File(default.fname,'a') as f:
+            del f[f'{inc}/geometry/u_p']
+        default = Result(default.fname).view(increments=inc)
+        x = default.deformed_coordinates(inc)
+        assert default.get_dataset_location('u_p(F)')
+        assert np.allclose(x,default.cell_coordinates+default.read_dataset(default.get_dataset_location('u_p(F)'),0))
+
     def test_add_Cauchy(self,default):
         default.add_Cauchy('P','F')
         loc = {'F':    default.get_dataset_location('F'),
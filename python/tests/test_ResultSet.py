@@ -0,0 +1,78 @@
+import shutil
+
+import pytest
+import numpy as np
+
+from damask import Result
+from damask import ResultSet
+
+@pytest.fixture
+def reference_dir(reference_dir_base):
+    """Directory containing reference results."""
+    return reference_dir_base/'Result'
+
+@pytest.fixture
+def study(tmp_path,reference_dir):
+    """Two Result files in temp location for modification."""
+    for fname in ['12grains6x7x8_tensionY.hdf5','6grains6x7x8_single_phase_tensionY.hdf5']:
+        shutil.copy(reference_dir/fname,tmp_path)
+    s = ResultSet(str(tmp_path/'*.hdf5'))
+    s.pick('increments',s[0].increments[-2:])
+    return s
+
+
+class TestResultSet:
+
+    def test_self_report(self,study):
+        print(study)
+
+    def test_glob(self,study):
+        assert len(study) == 2 and sorted(study.fnames) == study.fnames
+
+    @pytest.mark.parametrize('executor',['process','thread','serial'])
+    def test_add(self,study,executor):
+        study.set_executor(executor)
+        study.add_Cauchy()
+        for r in study:
+            for path in r.get_dataset_location('sigma'):
+                with r._file() as f:
+                    P,F = f[path.replace('sigma','P')][()],f[path.replace('sigma','F')][()]
+                    assert np.allclose(f[path][()],np.einsum('...ij,...kj',P,F)/np.linalg.det(F)[:,None,None])
+
+    @pytest.mark.parametrize('executor',['process','thread'])
+    def test_deferred(self,study,executor):
+        study.set_executor(executor)
+        study.defer()
+        study.add_Mises('sigma')
+        study.add_Cauchy()
+        assert not study[0].get_dataset_location('sigma')
+        study.compute()
+        for r in study:
+            assert r.get_dataset_location('sigma_vM')
+
+    def test_same_as_single(self,study,tmp_path,reference_dir):
+        fname = '12grains6x7x8_tensionY.hdf5'
+        shutil.copy(reference_dir/fname,tmp_path/'single.h5')
+        single = Result(tmp_path/'single.h5')
+        single.pick('increments',study[0].increments[-2:])
+        single.add_Cauchy()
+        single.add_Mises('sigma')
+        study.add_Cauchy()
+        study.add_Mises('sigma')
+        r = study[study.fnames.index(str(tmp_path/fname))]
+        assert np.allclose(r.read_dataset(r.get_dataset_location('sigma_vM')),
+                           single.read_dataset(single.get_dataset_location('sigma_vM')))
+
+    def test_reduce(self,study):
+        t = study.reduce('F',['mean','max'])
+        assert len(t.comments) == len(study)
+        for i,r in enumerate(study):
+            s = r.reduce('F',['mean'])
+            rows = t.get('run')[:,0] == i
+            assert np.allclose(t.get('mean(F)')[rows].reshape(-1,3,3),
+                               np.array([s[inc]['mean'] for inc in r.selection['increments']]))
+            assert np.allclose(t.get('time')[rows,0],[r.times[r.increments.index(inc)] for inc in r.selection['increments']])
+
+    def test_invalid_attribute(self,study):
+        with pytest.raises(AttributeError):
+            study.add_nothing()
@@ -56,6 +56,15 @@ class TestTable:
             new = Table.load(f)
         assert all(default.data==new.data) and default.shapes == new.shapes
 
+    @pytest.mark.parametrize('format',['npz','parquet','feather'])
+    def test_write_read_columnar(self,default,tmp_path,format):
+        if format != 'npz': pytest.importorskip('pyarrow')
+        default = default.add('i',np.arange(len(default)))
+        getattr(default,f'save_{format}')(tmp_path/f'default.{format}')
+        new = getattr(Table,f'load_{format}')(tmp_path/f'default.{format}')
+        assert all(default.data==new.data) and default.shapes == new.shapes and default.comments == new.comments \
+               and new.get('i').dtype == default.get('i').dtype
+
     def test_write_invalid_format(self,default,tmp_path):
         with pytest.raises(TypeError):
             default.save(tmp_path/'shouldnotbethere.txt',format='invalid')
@@ -70,13 +70,14 @@ class TestVTK:
         assert(string == vtu.__repr__() == vtk.__repr__())
 
 
-    def test_parallel_out(self,tmp_path):
+    @pytest.mark.parametrize('parallel',[True,'thread'])
+    def test_parallel_out(self,tmp_path,parallel):
         points = np.random.rand(102,3)
         v = VTK.from_poly_data(points)
         fname_s = tmp_path/'single.vtp'
         fname_p = tmp_path/'parallel.vtp'
         v.save(fname_s,False)
-        v.save(fname_p,True)
+        v.save(fname_p,parallel)
         for i in range(10):
             if os.path.isfile(fname_p) and filecmp.cmp(fname_s,fname_p):
                 assert(True)
@@ -136,6 +136,34 @@ class TestGridFilters:
          assert all(grid_filters.regrid(size,F,grid) == np.arange(grid.prod()))
 
 
+    def test_ks_cache(self):
+        size = np.random.random(3)+1.0
+        grid = np.random.randint(8,32,(3))
+        grid_filters.clear_cache()
+        k_s = grid_filters._ks(size,grid,True)
+        assert grid_filters._ks(list(size),tuple(grid),True) is k_s
+        assert grid_filters._ks(size,grid,False) is not k_s
+        assert not k_s.flags.writeable
+        grid_filters.clear_cache()
+        assert grid_filters._ks(size,grid,True) is not k_s
+
+    @pytest.mark.parametrize('differential_operator',[grid_filters.curl,
+                                                      grid_filters.divergence,
+                                                      grid_filters.gradient])
+    def test_differential_operator_workers(self,differential_operator):
+        size = np.random.random(3)+1.0
+        grid = np.random.randint(8,32,(3))
+        field = np.random.random(tuple(grid)+(3,))
+        assert np.allclose(differential_operator(size,field,workers=2),
+                           differential_operator(size,field))
+
+    def test_displacement_workers(self):
+        size = np.random.random(3)+1.0
+        grid = np.random.randint(8,32,(3))
+        F = np.broadcast_to(np.eye(3),tuple(grid)+(3,3)) + np.random.random(tuple(grid)+(3,3))*1.e-2
+        assert np.allclose(grid_filters.node_displacement(size,F,workers=2),
+                           grid_filters.node_displacement(size,F))
+
     @pytest.mark.parametrize('differential_operator',[grid_filters.curl,
                                                       grid_filters.divergence,
                                                       grid_filters.gradient])
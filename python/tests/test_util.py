@@ -15,6 +15,13 @@ class TestUtil:
         out,err = util.execute('sh -c "echo $test_for_execute"',env={'test_for_execute':'test'})
         assert out=='test\n' and err==''
 
+    @pytest.mark.parametrize('kind',['process','thread','serial'])
+    def test_start_workers(self,kind):
+        with util._executor(kind,3) as pool:
+            util._start_workers(pool,3)
+            if kind == 'process':
+                assert len(pool._processes) == 3 and all(p.is_alive() for p in pool._processes.values())
+
     def test_croak(self):
         util.croak('Burp!')
 
@@ -44,3 +51,14 @@ class TestUtil:
         selected = util.hybrid_IA(dist,N_samples)
         dist_sampled = np.histogram(centers[selected],bins)[0]/N_samples*np.sum(dist)
         assert np.sqrt(((dist - dist_sampled) ** 2).mean()) < .025 and selected.shape[0]==N_samples
+
+    def test_streaming_statistics(self):
+        x = np.random.lognormal(size=(20000,2))
+        moments,sketch,histogram = util._Moments(),util._QuantileSketch(),util._Histogram(np.linspace(0,5,11))
+        for chunk in np.array_split(x,7):
+            moments.merge(util._Moments(chunk))
+            sketch.merge(util._QuantileSketch(chunk))
+            histogram.merge(util._Histogram(np.linspace(0,5,11),chunk))
+        assert np.allclose(moments.mean,np.mean(x,axis=0)) and np.allclose(moments.std,np.std(x,axis=0))
+        assert np.allclose(sketch.quantile(.9),np.quantile(x,.9,axis=0),rtol=1e-2)
+        assert np.all(histogram.counts[1] == np.histogram(x[:,1],np.linspace(0,5,11))[0])